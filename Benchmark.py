@@ -0,0 +1,259 @@
+###############################################################################
+##  Name:    Joshua Becker                                                   ##
+##                                                                           ##
+##  Description: Benchmarks guarding the performance of the composer.        ##
+##               Run as a script, results are printed as JSON. Everything is ##
+##               seeded, so results of two commits may be diffed with        ##
+##               --compare. --check verifies every analyzer against the      ##
+##               scalar ScoreAnalyzer instead.                               ##
+###############################################################################
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import DNA
+import Population
+import ScoreAnalyzer
+import numpy
+
+SEED = 1234
+REPEAT = 3
+MIN_RUN_TIME = 0.05 # Seconds, each of the REPEAT runs calls a benchmark enough times to take at least this long
+
+# (population sizes, score lengths) to benchmark generations over
+GRID = ((100, 1000), (20, 100))
+QUICK_GRID = ((50,), (10,))
+
+# Genomes and score lengths --check compares the analyzers over, and the largest difference it accepts
+CHECK_GENOMES = 300
+CHECK_LENGTHS = (1, 2, 7, 40)
+CHECK_TOLERANCE = 1e-12
+
+# Run in a fresh interpreter so that nothing is imported beforehand
+STARTUP_SCRIPT = """
+import json, os, sys, time
+start = time.time()
+import DNA, Population, ScoreAnalyzer
+imported = time.time()
+stdout = sys.stdout
+sys.stdout = open(os.devnull, "w")
+Population.Population(8, 4).getGeneration([1.0] * 9)
+sys.stdout = stdout
+generated = time.time()
+print json.dumps({"import": imported - start, "firstGeneration": generated - imported,
+                  "music21Imported": "music21" in sys.modules})
+"""
+
+# Description:
+#   Time importing the evolutionary core and breeding a first generation in a fresh interpreter,
+#   and check that music21 was never imported along the way
+def benchmarkStartup():
+    directory = os.path.dirname(os.path.abspath(__file__))
+    output = subprocess.check_output([sys.executable, "-c", STARTUP_SCRIPT], cwd=directory)
+    return json.loads(output)
+
+# Description:
+#   Time a function, return the best seconds per call over REPEAT runs
+# Parameters:
+#   function (function): The function to time, called without arguments
+def timeCall(function):
+    number = 1
+    while True:
+        start = time.time()
+        for i in xrange(number):
+            function()
+        elapsed = time.time() - start
+        if elapsed >= MIN_RUN_TIME: break
+        number *= 10
+
+    best = elapsed
+    for run in range(1, REPEAT):
+        start = time.time()
+        for i in xrange(number):
+            function()
+        best = min(best, time.time() - start)
+    return best / number
+
+# Description:
+#   Time a function and return its result entry
+# Parameters:
+#   name (string): The name of the benchmark, together with parameters it identifies a result between runs
+#   parameters (dict): What the benchmark was run with
+#   function (function): The function to time, called without arguments
+def benchmark(name, parameters, function):
+    numpy.random.seed(SEED)
+    return {"name": name, "parameters": parameters, "seconds": timeCall(function)}
+
+# Description:
+#   Benchmark decoding, each analysis heuristic and breeding on single scores
+def benchmarkAnalysis(length):
+    numpy.random.seed(SEED)
+    data = DNA.randomGenomes(1, length)[0]
+    dataScore = DNA.generateDataScore(data)
+    melody = dataScore["melody"]
+    harmony = dataScore["harmony"]
+    parameters = {"length": length}
+
+    heuristics = [("analyzeMelodicMotion", lambda: ScoreAnalyzer.analyzeMelodicMotion(melody)),
+                  ("analyzeHarmonicConsonance", lambda: ScoreAnalyzer.analyzeHarmonicConsonance(harmony)),
+                  ("analyzeHarmonicConsistency", lambda: ScoreAnalyzer.analyzeHarmonicConsistency(harmony)),
+                  ("analyzeMacroharmony", lambda: ScoreAnalyzer.analyzeMacroharmony(melody, harmony)),
+                  ("analyzeCentricity", lambda: ScoreAnalyzer.analyzeCentricity(melody, harmony)),
+                  ("analyzeCohesion", lambda: ScoreAnalyzer.analyzeCohesion(melody, harmony)),
+                  ("analyzeNoteLength", lambda: ScoreAnalyzer.analyzeNoteLength(melody, harmony)),
+                  ("analyzeOctave", lambda: ScoreAnalyzer.analyzeOctave(melody, harmony)),
+                  ("analyzeCommonNotes", lambda: ScoreAnalyzer.analyzeCommonNotes(harmony))]
+
+    results = [benchmark("generateDataScore", parameters, lambda: DNA.generateDataScore(data))]
+    for name, function in heuristics:
+        results.append(benchmark(name, parameters, function))
+    results.append(benchmark("getAnalysisScore", parameters,
+                             lambda: ScoreAnalyzer.ScoreAnalyzer(dataScore).getAnalysisScore()))
+    results.append(benchmark("analyzeGenome", parameters, lambda: ScoreAnalyzer.analyzeGenome(data)))
+
+    mother = DNA.DNA(length)
+    father = DNA.DNA(length)
+    results.append(benchmark("DNA.breed", parameters, lambda: mother.breed(father)))
+    # A rate high enough that every call passes mutate()'s initial threshold
+    results.append(benchmark("DNA.mutate", {"length": length, "rate": 0.2}, lambda: mother.mutate(0.2)))
+    return results
+
+# Description:
+#   Benchmark analyzing and breeding whole generations of a population
+def benchmarkEvolution(size, length):
+    parameters = {"size": size, "length": length}
+    numpy.random.seed(SEED)
+    genomes = DNA.randomGenomes(size, length)
+    results = [benchmark("analyzeGenomes", parameters, lambda: ScoreAnalyzer.analyzeGenomes(genomes))]
+
+    for deterministic in (True, False):
+        population = Population.Population(size, length, reporter=None, seed=SEED)
+        name = "getGeneration(deterministic)" if deterministic else "getGeneration(probabilistic)"
+        results.append(benchmark(name, parameters, lambda: population.getGeneration([1.0] * 9, deterministic)))
+    return results
+
+# Description:
+#   Benchmark materializing a Music21 score, skipped if music21 is not installed
+def benchmarkScore(length):
+    try:
+        import music21
+    except ImportError:
+        return [{"name": "generateScore", "parameters": {"length": length}, "seconds": None, "skipped": "music21 missing"}]
+    numpy.random.seed(SEED)
+    data = DNA.randomGenomes(1, length)[0]
+    return [benchmark("generateScore", {"length": length}, lambda: DNA.generateScore(data))]
+
+# Description:
+#   Run every benchmark over a grid of population sizes and score lengths
+def runSuite(sizes, lengths):
+    results = []
+    for length in lengths:
+        results += benchmarkAnalysis(length)
+        results += benchmarkScore(length)
+        for size in sizes:
+            results += benchmarkEvolution(size, length)
+    return results
+
+# Description:
+#   Return random genomes for checkAnalyzers(), some with their rest bytes pushed up so that rests are common
+def getCheckGenomes(random, length):
+    genomes = DNA.randomGenomes(CHECK_GENOMES, length, random)
+    restful = genomes[::3].reshape(-1, length, 8)
+    restful[..., [2, 7]] |= random.randint(0, 2, restful[..., [2, 7]].shape).astype(numpy.uint8) * 112
+    genomes[::3] = restful.reshape(-1, length * 8)
+    return genomes
+
+# Description:
+#   Verify every fitness analyzer against the scalar ScoreAnalyzer: the batched pass, the fused single genome pass
+#   and the incremental updates of breeding and mutating. Returns a description of each mismatch, none if all agree.
+def checkAnalyzers():
+    random = numpy.random.RandomState(SEED)
+    failures = []
+    def compare(name, length, row, expected, actual):
+        difference = numpy.abs(numpy.asarray(expected) - numpy.asarray(actual)).max()
+        if not difference <= CHECK_TOLERANCE:
+            failures.append("%s, length %d, genome %d: off by %g" % (name, length, row, difference))
+
+    for length in CHECK_LENGTHS:
+        genomes = getCheckGenomes(random, length)
+        expected = [ScoreAnalyzer.ScoreAnalyzer(DNA.generateDataScore(genome)).getAnalysisScore() for genome in genomes]
+        batch = ScoreAnalyzer.analyzeGenomes(genomes)
+        for row in range(0, len(genomes)):
+            compare("analyzeGenomes", length, row, expected[row], batch[row])
+            compare("analyzeGenome", length, row, expected[row], ScoreAnalyzer.analyzeGenome(genomes[row]))
+
+        for row in range(0, len(genomes) - 1):
+            mother = DNA.DNA(length, genomes[row].copy())
+            father = DNA.DNA(length, genomes[row + 1].copy())
+            child = mother.breed(father, random)
+            reference = ScoreAnalyzer.ScoreAnalyzer(DNA.generateDataScore(child.data)).getAnalysisScore()
+            compare("DNA.breed", length, row, reference, child.getFitnessArray())
+            child.mutate(0.2, random)
+            reference = ScoreAnalyzer.ScoreAnalyzer(DNA.generateDataScore(child.data)).getAnalysisScore()
+            compare("DNA.mutate", length, row, reference, child.getFitnessArray())
+    return failures
+
+# Description:
+#   Print how each benchmark changed against previously saved results
+# Parameters:
+#   previous (dict): Results of an earlier run, as written by --output
+#   current (dict): Results of this run
+def printComparison(previous, current):
+    def key(result):
+        return result["name"] + " " + json.dumps(result["parameters"], sort_keys=True)
+    before = dict([(key(result), result["seconds"]) for result in previous["results"]])
+
+    for result in current["results"]:
+        old = before.get(key(result))
+        if old is None or result["seconds"] is None: continue
+        print "%-70s %12.6fs -> %12.6fs  x%.2f" % (key(result), old, result["seconds"], old / result["seconds"])
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the genetic composer.")
+    parser.add_argument("--startup-budget", type=float, default=1.0,
+                        help="Fail if importing the evolutionary core takes longer than this many seconds")
+    parser.add_argument("--startup-only", action="store_true", help="Only run the startup benchmark")
+    parser.add_argument("--quick", action="store_true", help="Run over a small grid, as a smoke test")
+    parser.add_argument("--output", help="Also write the results to this file")
+    parser.add_argument("--compare", help="Compare against results written by an earlier --output")
+    parser.add_argument("--check", action="store_true",
+                        help="Only verify the analyzers against the scalar ScoreAnalyzer, fail on any mismatch")
+    args = parser.parse_args()
+
+    if args.check:
+        failures = checkAnalyzers()
+        for failure in failures:
+            print >> sys.stderr, failure
+        print "Analyzers " + ("disagree in %d checks" % len(failures) if failures else "agree")
+        return 1 if failures else 0
+
+    startup = benchmarkStartup()
+    report = {"meta": {"python": platform.python_version(), "numpy": numpy.__version__, "seed": SEED},
+              "startup": startup}
+    if not args.startup_only:
+        sizes, lengths = QUICK_GRID if args.quick else GRID
+        report["results"] = runSuite(sizes, lengths)
+
+    print json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+    if args.compare and "results" in report:
+        with open(args.compare) as previous:
+            printComparison(json.load(previous), report)
+
+    if startup["music21Imported"]:
+        print >> sys.stderr, "The evolutionary core imported music21"
+        return 1
+    if startup["import"] > args.startup_budget:
+        print >> sys.stderr, "Importing the evolutionary core took longer than " + str(args.startup_budget) + "s"
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
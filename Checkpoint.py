@@ -0,0 +1,82 @@
+###############################################################################
+##  Name:    Joshua Becker                                                   ##
+##                                                                           ##
+##  Description: Binary snapshots of a Population, to resume long runs.      ##
+##               Genomes and fitness are stored as raw arrays so that they   ##
+##               may be memory-mapped back in, no DNA is ever pickled.       ##
+###############################################################################
+
+import numpy
+import os
+import struct
+
+# File layout, all little endian:
+#   header: magic, size, length (in notes), generation, mutation rate, 9 modifiers
+#   random: the population's Mersenne Twister state, 624 keys, position, has gauss, cached gaussian
+#   genomes: (size, length * 8) uint8, starting at an 8 byte boundary
+#   fitness: (size, 9) float64, starting at an 8 byte boundary
+MAGIC = "GCCKPT01"
+HEADER = struct.Struct("<8sIIQd9d")
+RANDOM = struct.Struct("<624IIid")
+
+# Description:
+#   Return the offsets of the genome and fitness arrays in a checkpoint
+def getOffsets(size, length):
+    genomesOffset = align(HEADER.size + RANDOM.size)
+    fitnessOffset = align(genomesOffset + size * length * 8)
+    return genomesOffset, fitnessOffset
+
+def align(offset):
+    return (offset + 7) // 8 * 8
+
+# Description:
+#   Snapshot a population to a file. The file is written aside and then moved into place,
+#   so an interrupted save never clobbers the previous checkpoint.
+# Parameters:
+#   path (string): The file to write
+#   population (Population): The population to snapshot
+def save(path, population):
+    size, columns = population.genomes.shape
+    genomesOffset, fitnessOffset = getOffsets(size, columns // 8)
+    name, keys, position, hasGauss, cachedGaussian = population.random.get_state()
+
+    temporaryPath = path + ".tmp"
+    with open(temporaryPath, "wb") as checkpoint:
+        checkpoint.write(HEADER.pack(MAGIC, size, columns // 8, population.generation, population.rate,
+                                     *population.modifiers))
+        checkpoint.write(RANDOM.pack(*(list(keys) + [position, hasGauss, cachedGaussian])))
+        checkpoint.seek(genomesOffset)
+        checkpoint.write(numpy.ascontiguousarray(population.genomes, dtype=numpy.uint8).tobytes())
+        checkpoint.seek(fitnessOffset)
+        checkpoint.write(numpy.ascontiguousarray(population.fitness, dtype="<f8").tobytes())
+    os.rename(temporaryPath, path)
+
+# Description:
+#   Load a checkpoint written by save(). The genome and fitness arrays are memory-mapped copy-on-write,
+#   so they are only read from disk as they are used and writing to them never touches the file.
+# Parameters:
+#   path (string): The file to read
+# Returns:
+#   { size ; length ; generation ; rate ; modifiers ; random ; genomes ; fitness },
+#   random being a state for numpy.random.RandomState.set_state()
+def load(path):
+    with open(path, "rb") as checkpoint:
+        header = HEADER.unpack(checkpoint.read(HEADER.size))
+        random = RANDOM.unpack(checkpoint.read(RANDOM.size))
+    if header[0] != MAGIC:
+        raise ValueError("Not a population checkpoint: " + path)
+
+    size, length, generation, rate = header[1:5]
+    genomesOffset, fitnessOffset = getOffsets(size, length)
+    genomes = numpy.memmap(path, dtype=numpy.uint8, mode="c", offset=genomesOffset, shape=(size, length * 8))
+    fitness = numpy.memmap(path, dtype="<f8", mode="c", offset=fitnessOffset, shape=(size, 9))
+
+    return {"size": size,
+            "length": length,
+            "generation": generation,
+            "rate": rate,
+            "modifiers": list(header[5:]),
+            "random": ("MT19937", numpy.array(random[:624], dtype=numpy.uint32),
+                       random[624], random[625], random[626]),
+            "genomes": genomes,
+            "fitness": fitness}
@@ -4,19 +4,30 @@
 ##  Description: An abstraction of our genetic "DNA" for our scores.         ##
 ###############################################################################
 
-from music21 import *
-import random
+import DataScore
+import numpy
+import MidiWriter
 import ScoreAnalyzer
 
+# The largest fraction of a child's notes DNA.breed() updates a parent's statistics over,
+# beyond it one fresh pass over the child is faster
+INCREMENTAL_FRACTION = 0.1
+
 ###########################################################################
 #                              Utilities                                  #
 ###########################################################################
 
 # Description:
-#   Helper function to generate a score from arbitrary data
+#   Helper function to generate a score from arbitrary data.
+#   music21 is only imported here, the evolutionary loop never needs it.
 # Parameters:
 #   data ([7bits]): An array of arbitrary 7 bits
 def generateScore(data):
+    from music21 import stream, note, chord
+
+    if isinstance(data, numpy.ndarray):
+        data = data.tolist()
+
     melody = stream.Part()
     melody.id = "melody"
     harmony = stream.Part()
@@ -71,42 +82,58 @@ def generateScore(data):
 # Parameters:
 #   data ([7bits]): An array of arbitrary 7 bits
 # DataScore Format:
-#   { harmony: [[chordNotes], quarterLength] ; melody: [note, quarterLength] }
-#   chordArray = [(midi, midi, midi, quarterLength)]
-#   noteArray = [(midi, quarterLength)]
-#   midi may be -1 to indicate a rest
+#   A DataScore (See DataScore.py), parallel arrays with one entry per note:
+#   melody, melodyLength, melodyRest, chords (three notes each), harmonyLength, harmonyRest.
+#   A length is an index 0-15, the quarter length being (index + 1) / 4.0.
+#   dataScore["melody"] and dataScore["harmony"] still give the old lists,
+#   [(midi, quarterLength)] and [([midi, midi, midi], quarterLength)], midi being -1 for a rest
 def generateDataScore(data):
-    melody = []
-    harmony = []
+    return DataScore.decode(numpy.asarray(data, dtype=numpy.uint8))
 
-    i = 0
-    while i < len(data):
-        # Get melody note
-        midi = data[i]
-        # midi = data[i] % 12 + 60
-        quarter = (data[i + 1] % 16 + 1) / 4.0
-        # quarter = 2
+# Description:
+#   Scale modifiers (See DNA.getFitness()) to sum to one, so that a weighted fitness is a single dot product
+# Parameters:
+#   modifiers ([Number]): An array of numbers corresponding to which characteristics to emphasize.
+def normalizeModifiers(modifiers):
+    modifiers = numpy.asarray(modifiers, dtype=float)
+    return modifiers / modifiers.sum()
 
-        # TODO: Reconsider rest logic, this feels very arbitrary
-        if data[i + 2] > 115:
-            melody.append((-1, quarter))
-        else:
-            melody.append((midi, quarter))
+# Description:
+#   Generate a matrix of random genomes, one genome per row.
+#   Eight 7-bits are needed per note (melody+harmony notes)
+# Parameters:
+#   size (number): The number of genomes to generate
+#   length (number): The length of each genome in number of notes
+#   random (numpy.random.RandomState) - optional: The generator to draw from, the global one by default
+def randomGenomes(size, length, random=numpy.random):
+    return random.randint(0, 128, (size, length * 8), dtype=numpy.uint8)
 
-        # TODO: Do more than just triads?
-        midi = [data[i + 3], data[i + 4], data[i + 5]]
-        # midi = [data[i + 3] % 12 + 48, data[i + 4] % 12 + 48, data[i + 5] % 12 + 48]
-        quarter = (data[i + 6] % 16 + 1) / 4.0
-        # quarter = 2
+# Description:
+#   Crossover rows of two genome matrices with the random midpoint method (See DNA.breed())
+# Parameters:
+#   mothers (numpy.ndarray): Genome matrix to take the data before each midpoint from
+#   fathers (numpy.ndarray): Genome matrix to take the data from each midpoint onward from
+#   midpoints (numpy.ndarray): One midpoint per row
+def crossover(mothers, fathers, midpoints):
+    columns = numpy.arange(mothers.shape[1])
+    return numpy.where(columns < midpoints[:, None], mothers, fathers)
 
-        # TODO: Reconsider rest logic, this feels very arbitrary
-        if data[i + 7] > 115:
-            harmony.append((-1, quarter))
-        else:
-            harmony.append((midi, quarter))
-        i += 8
-    dataScore = {"melody": melody, "harmony": harmony}
-    return dataScore
+# Description:
+#   Draw the mutations for a batch of genomes (See DNA.mutate()) without applying them
+# Parameters:
+#   count (number): The number of genomes (rows) to draw mutations for
+#   columns (number): The number of bytes in each genome
+#   rate (number): The probability by which each byte will mutate
+#   random (numpy.random.RandomState) - optional: The generator to draw from, the global one by default
+# Returns:
+#   (rows, columns, values), the mutated positions and their new values, in row order
+def drawMutations(count, columns, rate, random=numpy.random):
+    # As in DNA.mutate(), only rows passing an initial threshold are iterated through
+    rows = numpy.flatnonzero(random.random_sample(count) <= (rate * 5))
+    mask = random.random_sample((len(rows), columns)) < rate
+    mutatedRows, mutatedColumns = numpy.nonzero(mask)
+    values = random.randint(0, 128, len(mutatedRows), dtype=numpy.uint8)
+    return rows[mutatedRows], mutatedColumns, values
 
 
 
@@ -116,21 +143,33 @@ def generateDataScore(data):
 
 class DNA:
     # Description:
-    #   Create a random strand of DNA
+    #   Create a random strand of DNA, or a view onto existing data
     # Parameters:
     #   length (number): The length of this 'strand' of DNA in number of notes
-    def __init__(self, length):
-        data = []
-        # Eight 7-bits are needed per note (melody+harmony notes)
-        for i in range(0, length * 8):
-            data.append(random.randint(0, 127))
+    #   data (numpy.ndarray) - optional: The genome to use instead of a random one, usually a row of a
+    #                                    Population's genome matrix. This is a view, not a copy.
+    #   fitness ([Number]) - optional: The already known fitness of data, skips analysis
+    #   cache (FitnessCache) - optional: A fitness cache to consult before analyzing, passed on to children
+    #   random (numpy.random.RandomState) - optional: The generator to draw random data from, the global one by default
+    def __init__(self, length, data=None, fitness=None, cache=None, random=numpy.random):
+        if data is None:
+            data = randomGenomes(1, length, random)[0]
 
         self.data = data
-        self.dataScore = generateDataScore(self.data) # An inbetween the arbitrary data stream and the Music21 score stream
+        self.dataScore = None # An inbetween the arbitrary data stream and the Music21 score stream, decoded on demand
         self.score = None
+        self.cache = cache
+        self.statistics = None # Sufficient statistics to update the fitness incrementally, see getStatistics()
+        self.weightedFitness = None # The last result of getFitness() and the modifiers it was for
+        self.weightedModifiers = None
 
-        analyzer = ScoreAnalyzer.ScoreAnalyzer(self.dataScore)
-        self.fitness = analyzer.getAnalysisScore()
+        if fitness is None and cache is not None:
+            fitness = cache.evaluate(data[None])[0]
+        elif fitness is None:
+            # One pass over the genome, keeping the statistics for breeding and mutating (See getStatistics())
+            self.statistics = ScoreAnalyzer.ScoreStatistics(data)
+            fitness = numpy.array(self.statistics.getAnalysisScore())
+        self.fitness = fitness
 
     # Description:
     #   Return this DNA's fitness, how "good" this DNA is. Darwin would be proud.
@@ -139,14 +178,11 @@ class DNA:
     #                         In the order of: Motion, consonance, consistency, macroharmony,
     #                         centricity, cohesion, note length, octave, and common notes between chords.
     def getFitness(self, modifiers):
-        i = 0
-        sum = 0.0
-        modSum = 0.0
-        while i < len(self.fitness):
-            sum += self.fitness[i] * modifiers[i]
-            modSum += modifiers[i]
-            i += 1
-        return (sum / modSum)
+        modifiers = tuple(modifiers)
+        if self.weightedFitness is None or modifiers != self.weightedModifiers:
+            self.weightedFitness = float(numpy.dot(self.fitness, normalizeModifiers(modifiers)))
+            self.weightedModifiers = modifiers
+        return self.weightedFitness
 
     def getFitnessArray(self):
         return self.fitness
@@ -156,49 +192,94 @@ class DNA:
     #   Crossover these strands of DNA to produce a child. Birds, bees, and all that jazz.
     # Parameters:
     #   partner (DNA): The other DNA to breed this DNA with
-    def breed(self, partner):
+    #   random (numpy.random.RandomState) - optional: The generator to draw the midpoint from, the global one by default
+    def breed(self, partner, random=numpy.random):
         if len(self.data) != len(partner.data):
             raise ValueError("Attempted to breed DNA of differing lengths.")
 
         # Use the random midpoint method,
         # choose a random "midpoint" to pick the DNA from self and the rest from partner
         length = len(self.data)
-        midpoint = random.randint(0, length)
-
-        crossBred = []
-        for i in range(0, length):
-            if i < midpoint:
-                crossBred.append(self.data[i])
-            else:
-                crossBred.append(partner.data[i])
-
-        child = DNA(0)
-        child.data = crossBred
-        child.dataScore = generateDataScore(child.data)
-        child.score = None
-        analyzer = ScoreAnalyzer.ScoreAnalyzer(child.dataScore)
-        child.fitness = analyzer.getAnalysisScore()
+        midpoint = random.randint(0, length + 1)
+        crossBred = numpy.concatenate((self.data[:midpoint], partner.data[midpoint:]))
+
+        # When the child differs from a parent in only a few notes, update that parent's statistics
+        # rather than analyzing the child from scratch
+        notes = length // 8
+        splitNote = midpoint // 8
+        partnerNotes = splitNote + (1 if midpoint % 8 else 0) # Notes in which the child may differ from partner
+        if min(partnerNotes, notes - splitNote) > notes * INCREMENTAL_FRACTION:
+            statistics = ScoreAnalyzer.ScoreStatistics(crossBred)
+        elif partnerNotes < notes - splitNote:
+            statistics = partner.getStatistics().copy()
+            statistics.update(partner.data, crossBred, 0, partnerNotes)
+        else:
+            statistics = self.getStatistics().copy()
+            statistics.update(self.data, crossBred, splitNote, notes)
+
+        child = DNA(0, crossBred, statistics.getAnalysisScore(), self.cache)
+        child.statistics = statistics
         return child
 
     # Description:
     #   In order to ensure enough variation, allow subtle mutations
     # Parameters:
     #   rate (number): The probability by which this DNA will mutate
-    def mutate(self, rate):
-        changed = False
+    #   random (numpy.random.RandomState) - optional: The generator to draw the mutations from, the global one by default
+    def mutate(self, rate, random=numpy.random):
         # Intended to speed up generation, only iterate through mutation if an initial threshold is passed
-        if random.random() > (rate * 5):
+        if random.random_sample() > (rate * 5):
             return
 
-        for i in range(0, len(self.data)):
-            if random.random() < rate:
-                changed = True
-                self.data[i] = random.randint(0, 127)
-        if changed:
+        mask = random.random_sample(len(self.data)) < rate
+        if not mask.any():
+            return
+
+        statistics = self.getStatistics()
+        # Copy on write, data may be a read-only view onto a Population's genome matrix
+        previous = self.data
+        self.data = self.data.copy()
+        self.data[mask] = random.randint(0, 128, numpy.count_nonzero(mask), dtype=numpy.uint8)
+        # Update the fitness one mutated note at a time, each update may only see a single note differ
+        for note in numpy.unique(numpy.flatnonzero(mask) // 8):
+            current = previous.copy()
+            current[note * 8:note * 8 + 8] = self.data[note * 8:note * 8 + 8]
+            statistics.update(previous, current, note, note + 1)
+            previous = current
+
+        self.fitness = statistics.getAnalysisScore()
+        self.weightedFitness = None
+        self.dataScore = None
+        self.score = None
+
+    # Description:
+    #   Return the sufficient statistics of this DNA's fitness (See ScoreAnalyzer.ScoreStatistics)
+    def getStatistics(self):
+        if self.statistics is None:
+            self.statistics = ScoreAnalyzer.ScoreStatistics(self.data)
+        return self.statistics
+
+    # Description:
+    #   Return this DNA as a dataScore (See generateDataScore())
+    def getDataScore(self):
+        if self.dataScore is None:
             self.dataScore = generateDataScore(self.data)
+        return self.dataScore
+
+    # Description:
+    #   Return this DNA as the bytes of a Standard MIDI File (See MidiWriter.py)
+    def getMidi(self):
+        return MidiWriter.getMidi(self.getDataScore())
+
+    # Description:
+    #   Write this DNA to a Standard MIDI File
+    # Parameters:
+    #   output (string or file): A path to write to, or an open binary file-like object
+    def writeMidi(self, output):
+        MidiWriter.writeMidi(self.getDataScore(), output)
 
     # Description:
-    #   Return this DNA as a score
+    #   Return this DNA as a Music21 score. Much slower than getMidi(), and requires music21.
     def getScore(self):
         if self.score is None:
             self.score = generateScore(self.data)
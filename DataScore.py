@@ -0,0 +1,67 @@
+###############################################################################
+##  Name:    Joshua Becker                                                   ##
+##                                                                           ##
+##  Description: A compact, array-backed dataScore: parallel fixed-width     ##
+##               arrays of pitches, chord notes, lengths and rest masks,     ##
+##               decoded from one genome or a whole genome matrix at once.   ##
+###############################################################################
+
+# Genome bytes are 7 bits, anything above this marks a rest (See DNA.generateDataScore())
+REST_THRESHOLD = 115
+
+class DataScore:
+    # No per-instance dict, a population may hold thousands of these
+    __slots__ = ("melody", "melodyLength", "melodyRest", "chords", "harmonyLength", "harmonyRest")
+
+    # Description:
+    #   Create a dataScore from its arrays, see decode(). Each array has a leading axis per score when batched.
+    # Parameters:
+    #   melody (numpy.ndarray): (notes,) MIDI pitch of each melody note
+    #   melodyLength (numpy.ndarray): (notes,) length of each melody note, in sixteenths minus one (0 - 15)
+    #   melodyRest (numpy.ndarray): (notes,) whether each melody note is a rest
+    #   chords (numpy.ndarray): (notes, 3) MIDI pitches of each chord
+    #   harmonyLength (numpy.ndarray): (notes,) length of each chord, as melodyLength
+    #   harmonyRest (numpy.ndarray): (notes,) whether each chord is a rest
+    def __init__(self, melody, melodyLength, melodyRest, chords, harmonyLength, harmonyRest):
+        self.melody = melody
+        self.melodyLength = melodyLength
+        self.melodyRest = melodyRest
+        self.chords = chords
+        self.harmonyLength = harmonyLength
+        self.harmonyRest = harmonyRest
+
+    def __len__(self):
+        return len(self.melody)
+
+    # Description:
+    #   Return a part in the original list format, built on demand:
+    #   "melody" -> [(midi, quarterLength)], "harmony" -> [([midi, midi, midi], quarterLength)], midi -1 for rests.
+    #   Lets code written against the old dict dataScore, such as ScoreAnalyzer.ScoreAnalyzer, keep working.
+    # Parameters:
+    #   part (string): "melody" or "harmony"
+    def __getitem__(self, part):
+        if self.melody.ndim != 1:
+            raise ValueError("Only a single dataScore has parts, not a batch.")
+
+        if part == "melody":
+            pitches, lengths, rests = self.melody.tolist(), self.melodyLength.tolist(), self.melodyRest.tolist()
+        elif part == "harmony":
+            pitches, lengths, rests = self.chords.tolist(), self.harmonyLength.tolist(), self.harmonyRest.tolist()
+        else:
+            raise KeyError(part)
+        return [(-1 if rest else midi, (length + 1) / 4.0) for midi, length, rest in zip(pitches, lengths, rests)]
+
+# Description:
+#   Decode a genome, or a genome matrix in bulk, into a DataScore.
+#   The pitch arrays are views onto genomes and keep its dtype, only lengths and rest masks are allocated.
+#   Cast uint8 genomes to a signed type first when the pitches are to be subtracted.
+# Parameters:
+#   genomes (numpy.ndarray): A (length * 8) genome or an (N, length * 8) genome matrix (See DNA.py)
+def decode(genomes):
+    notes = genomes.reshape(genomes.shape[:-1] + (-1, 8))
+    return DataScore(notes[..., 0],
+                     notes[..., 1] % 16,
+                     notes[..., 2] > REST_THRESHOLD,
+                     notes[..., 3:6],
+                     notes[..., 6] % 16,
+                     notes[..., 7] > REST_THRESHOLD)
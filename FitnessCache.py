@@ -0,0 +1,123 @@
+###############################################################################
+##  Name:    Joshua Becker                                                   ##
+##                                                                           ##
+##  Description: A bounded, least recently used cache of fitness arrays,     ##
+##               keyed on the bytes of the genome that was analyzed.         ##
+##               Converged populations are full of duplicate genomes, so     ##
+##               this saves re-analyzing them.                               ##
+###############################################################################
+
+import Metrics
+import numpy
+import ScoreAnalyzer
+
+class FitnessCache:
+
+    # Description:
+    #   Create a fitness cache
+    # Parameters:
+    #   capacity (number) - optional: The most fitness arrays to hold before evicting the least recently used.
+    #                                 0 disables caching, everything is analyzed.
+    def __init__(self, capacity=4096):
+        if capacity < 0:
+            raise ValueError("Fitness cache capacity must not be negative.")
+
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.clear()
+
+    # Description:
+    #   Return the fitness array cached for a genome, None if there is none
+    # Parameters:
+    #   genome (numpy.ndarray): A genome, see DNA.py
+    def get(self, genome):
+        slot = self.__slots.get(self.__getKey(genome))
+        if slot is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.__clock += 1
+        self.__used[slot] = self.__clock
+        return self.__fitness[slot].copy()
+
+    # Description:
+    #   Cache the fitness array of a genome
+    # Parameters:
+    #   genome (numpy.ndarray): A genome, see DNA.py
+    #   fitness (numpy.ndarray): Its fitness array, see ScoreAnalyzer.getAnalysisScore()
+    def put(self, genome, fitness):
+        key = self.__getKey(genome)
+        self.__clock += 1
+        if key in self.__slots:
+            slot = self.__slots[key]
+            self.__fitness[slot] = fitness
+            self.__used[slot] = self.__clock
+        else:
+            self.__store([key], numpy.asarray(fitness)[None])
+
+    # Description:
+    #   Return the fitness matrix of a genome matrix, only analyzing the genomes that are not cached.
+    #   Duplicates within genomes are found in bulk and only analyzed once.
+    # Parameters:
+    #   genomes (numpy.ndarray): (N, length * 8) genome matrix, see ScoreAnalyzer.analyzeGenomes()
+    #   metrics (Metrics) - optional: Passed on to ScoreAnalyzer.analyzeGenomes()
+    def evaluate(self, genomes, metrics=Metrics.NULL_METRICS):
+        if self.capacity == 0:
+            self.misses += len(genomes)
+            return ScoreAnalyzer.analyzeGenomes(genomes, metrics)
+
+        # Each row as one opaque value, so that numpy sorts out the duplicates instead of a loop over rows
+        genomes = numpy.ascontiguousarray(genomes)
+        rows = genomes.view("V%d" % genomes.shape[1]).ravel()
+        unique, first, inverse = numpy.unique(rows, return_index=True, return_inverse=True)
+        keys = [row.tobytes() for row in unique]
+        slots = numpy.array([self.__slots.get(key, -1) for key in keys], dtype=numpy.intp)
+
+        self.__clock += 1
+        fitness = numpy.empty((len(unique), 9))
+        cached = slots >= 0
+        fitness[cached] = self.__fitness[slots[cached]]
+        self.__used[slots[cached]] = self.__clock
+        pending = numpy.flatnonzero(~cached)
+        self.misses += len(pending)
+        self.hits += len(genomes) - len(pending)
+
+        if len(pending) > 0:
+            fitness[pending] = ScoreAnalyzer.analyzeGenomes(genomes[first[pending]], metrics)
+            self.__store([keys[i] for i in pending], fitness[pending])
+        return fitness[inverse]
+
+    def clear(self):
+        self.__slots = {} # Genome bytes -> row of the store holding its fitness
+        self.__keys = [None] * self.capacity # The genome bytes each row of the store holds, None while free
+        self.__fitness = numpy.empty((self.capacity, 9)) # The store, one fitness array per row
+        self.__used = numpy.zeros(self.capacity, dtype=numpy.int64) # When each row was last used, 0 while free
+        self.__clock = 0
+
+    def __len__(self):
+        return len(self.__slots)
+
+    def __getKey(self, genome):
+        return numpy.ascontiguousarray(genome).tobytes()
+
+    # Description:
+    #   Store the fitness arrays of genomes that are not cached, in the free or least recently used rows of the store.
+    #   Should there be more than fit, the last ones are kept.
+    def __store(self, keys, fitness):
+        count = min(len(keys), self.capacity)
+        if count == 0:
+            return
+        keys = keys[len(keys) - count:]
+        if count < self.capacity:
+            slots = numpy.argpartition(self.__used, count - 1)[:count]
+        else:
+            slots = numpy.arange(self.capacity)
+
+        for slot, key in zip(slots.tolist(), keys):
+            if self.__keys[slot] is not None:
+                del self.__slots[self.__keys[slot]]
+            self.__keys[slot] = key
+            self.__slots[key] = slot
+        self.__fitness[slots] = fitness[len(fitness) - count:]
+        self.__used[slots] = self.__clock
@@ -0,0 +1,138 @@
+###############################################################################
+##  Name:    Joshua Becker                                                   ##
+##                                                                           ##
+##  Description: The island model: several populations evolving in their     ##
+##               own processes, their fittest DNA migrating around a ring    ##
+##               of islands every few generations.                           ##
+###############################################################################
+
+import DNA
+import Population
+import Queue
+import Reporting
+import multiprocessing
+import numpy
+
+# Seconds between two checks on the island processes while waiting for results
+POLL_INTERVAL = 0.1
+
+# Description:
+#   Evolve one island until told to stop. Module level so that it may run in its own process.
+# Parameters:
+#   index (number): The number of this island
+#   settings (dict): size, length, rate, modifiers, deterministic, migrationInterval, migrants and seed
+#   inbox (multiprocessing.Queue): Where migrants from the previous island arrive
+#   outbox (multiprocessing.Queue): Where migrants to the next island are sent
+#   results (multiprocessing.Queue): Where the best child of each generation is sent to the coordinator
+#   stop (multiprocessing.Event): Set by the coordinator once it is done
+def runIsland(index, settings, inbox, outbox, results, stop):
+    # Whatever is still queued once the coordinator stops is of no use, do not hold up exiting for it
+    for queue in (inbox, outbox, results):
+        queue.cancel_join_thread()
+
+    modifiers = settings["modifiers"]
+    population = Population.Population(settings["size"], settings["length"], settings["rate"], modifiers, reporter=None,
+                                       seed=settings["seed"])
+    while not stop.is_set():
+        best = population.getGeneration(modifiers, settings["deterministic"])
+        results.put((index, population.generation, best.getFitness(modifiers), best.data.tobytes(),
+                     [float(value) for value in best.getFitnessArray()]))
+
+        if settings["migrants"] == 0 or population.generation % settings["migrationInterval"] != 0: continue
+        genomes, fitness = population.getFittest(settings["migrants"])
+        outbox.put((genomes.tobytes(), fitness))
+        # Take in whoever has arrived, never wait on a slower neighbour
+        while True:
+            try:
+                genomes, fitness = inbox.get_nowait()
+            except Queue.Empty:
+                break
+            genomes = numpy.frombuffer(genomes, dtype=numpy.uint8).reshape(len(fitness), -1)
+            population.replaceWeakest(genomes, fitness)
+
+
+class IslandRunner:
+
+    # Description:
+    #   Create an island model score generator
+    # Parameters:
+    #   islands (number): The number of islands, each evolving in its own process
+    #   size (number): The size of each island's population
+    #   length (number): The length of the score to be generated. Currently relates to "number of notes".
+    #   rate (number): The mutation rate. (See DNA.py, mutate())
+    #   modifiers ([Number]): See ScoreGenerator.py
+    #   migrationInterval (number) - optional: The number of generations between two migrations
+    #   migrants (number) - optional: The number of fittest DNA each island sends to the next on a migration, 0 for none
+    #   seed (number) - optional: Seeds the islands, island i being seeded with seed + i
+    #   reporter (Reporter) - optional: Given a record of each island generation (See Reporting.py), with an added
+    #                                   island number. None to report nothing.
+    def __init__(self, islands, size, length, rate=0.01, modifiers=[1.0,1.0,1.0,1.0,1.0,1.0,1.0,1.0,1.0],
+                 migrationInterval=5, migrants=2, seed=None, reporter=Reporting.PrintReporter()):
+        if islands < 1:
+            print "Number of islands must be at least 1"
+            return
+        if size < 2:
+            print "Size of each island must be greater than 1"
+            return
+        if length < 1:
+            print "Length of DNA must be greater than 0"
+            return
+        if migrants < 0 or migrants >= size:
+            print "Number of migrants must be at least 0 and smaller than the size of an island"
+            return
+        if migrationInterval < 1:
+            print "Migration interval must be at least 1 generation"
+            return
+
+        self.islands = islands
+        self.length = length
+        self.modifiers = modifiers
+        self.reporter = reporter
+        self.settings = {"size": size, "length": length, "rate": rate, "modifiers": modifiers,
+                         "migrationInterval": migrationInterval, "migrants": migrants}
+        self.seed = seed if seed is not None else numpy.random.randint(0, 2 ** 31 - islands)
+
+    # Description:
+    #   Evolve the islands until any island's best child reaches the threshold, then return that child.
+    #   Raises RuntimeError should an island process die before then.
+    # Parameters:
+    #   threshold (number): The goal value. Between 0.0 and 1.0
+    #   deterministic (boolean): Whether or not each island uses the deterministic generation method
+    def generate(self, threshold, deterministic=True):
+        queues = [multiprocessing.Queue() for i in range(self.islands)] # Island i's inbox
+        results = multiprocessing.Queue()
+        stop = multiprocessing.Event()
+        processes = []
+        for i in range(self.islands):
+            settings = dict(self.settings, deterministic=deterministic, seed=self.seed + i)
+            process = multiprocessing.Process(target=runIsland,
+                                              args=(i, settings, queues[i], queues[(i + 1) % self.islands], results, stop))
+            process.daemon = True
+            process.start()
+            processes.append(process)
+
+        try:
+            while True:
+                try:
+                    island, generation, fitness, genome, fitnessArray = results.get(timeout=POLL_INTERVAL)
+                except Queue.Empty:
+                    # Islands only exit once stopped, any that has exited by now has crashed
+                    dead = [i for i in range(self.islands) if not processes[i].is_alive()]
+                    if dead and results.empty():
+                        raise RuntimeError("Island " + str(dead[0]) + " exited with code " +
+                                           str(processes[dead[0]].exitcode))
+                    continue
+                if self.reporter is not None:
+                    self.reporter.report({"island": island, "generation": generation,
+                                          "fitness": fitness, "fitnessArray": fitnessArray})
+                if fitness >= threshold:
+                    break
+        finally:
+            stop.set()
+            for process in processes:
+                process.join(5)
+                if process.is_alive():
+                    process.terminate()
+
+        genome = numpy.frombuffer(genome, dtype=numpy.uint8).copy()
+        return DNA.DNA(self.length, genome, fitnessArray)
@@ -0,0 +1,413 @@
+###############################################################################
+##  Name:    Joshua Becker                                                   ##
+##                                                                           ##
+##  Description: A local HTTP job server generating scores for many clients  ##
+##               at once. Each job evolves in its own process, a bounded     ##
+##               number at a time, while the server threads stay free to     ##
+##               stream progress, cancel jobs and hand out MIDI files.       ##
+###############################################################################
+
+import BaseHTTPServer
+import Queue
+import ScoreGenerator
+import SocketServer
+import argparse
+import cStringIO
+import collections
+import itertools
+import json
+import multiprocessing
+import socket
+import sys
+import threading
+
+# Jobs not given maxGenerations are capped at this many, so that every job has a bounded cost
+DEFAULT_MAX_GENERATIONS = 1000
+# Seconds between two checks of a running job for cancellation or a dead process
+POLL_INTERVAL = 0.1
+
+# Job API:
+#   POST   /jobs              { size ; length ; rate ; modifiers ; threshold ; deterministic ;
+#                               maxGenerations ; timeLimit ; seed }, only size and length are required.
+#                             -> 201 { id }
+#   GET    /jobs/<id>         -> { id ; state ; generation ; fitness ; result ; error }
+#   GET    /jobs/<id>/progress -> One line of JSON per generation as it is bred (See Reporting.py),
+#                                 then the job's status as the last line. Once a job is finished its
+#                                 records are dropped, only its status is sent.
+#   GET    /jobs/<id>/midi    -> The generated Standard MIDI File, 409 until the job is done
+#   DELETE /jobs/<id>         -> Cancel the job, killing its process if it is running
+#   state is one of "queued", "running", "done", "failed" or "cancelled"
+#   Only the most recently finished jobs are kept, older ones answer 404 (See JobManager's maxFinished)
+
+###########################################################################
+#                              Job Process                                #
+###########################################################################
+
+class QueueReporter:
+    # Description:
+    #   Send each generation's record (See Reporting.py) to the server over a queue
+    def __init__(self, queue):
+        self.queue = queue
+
+    def report(self, record):
+        self.queue.put(("progress", record))
+
+# Description:
+#   Run one job to completion. Module level so that it may run in its own process.
+# Parameters:
+#   settings (dict): The job's settings, see getSettings()
+#   queue (multiprocessing.Queue): Where progress, then ("done", result, midi) or ("error", message) is sent
+def runJob(settings, queue):
+    try:
+        generator = ScoreGenerator.ScoreGenerator(settings["size"], settings["length"], settings["rate"],
+                                                  settings["modifiers"], reporter=QueueReporter(queue),
+                                                  seed=settings["seed"])
+        midi = cStringIO.StringIO()
+        best = generator.generate(settings["threshold"], settings["deterministic"], midi,
+                                  maxGenerations=settings["maxGenerations"], timeLimit=settings["timeLimit"])
+        result = {"fitness": best.getFitness(settings["modifiers"]),
+                  "fitnessArray": [float(value) for value in best.getFitnessArray()],
+                  "generations": generator.population.generation,
+                  "stopReason": generator.stopReason}
+        queue.put(("done", result, midi.getvalue()))
+    except Exception as error:
+        queue.put(("error", str(error)))
+
+# Description:
+#   Whether a decoded JSON value is an integer, JSON's true and false being bools rather than 1 and 0
+def isInteger(value):
+    return isinstance(value, (int, long)) and not isinstance(value, bool)
+
+# Description:
+#   Whether a decoded JSON value is a number, see isInteger()
+def isNumber(value):
+    return isinstance(value, (int, long, float)) and not isinstance(value, bool)
+
+# Description:
+#   Validate the settings of a submitted job and fill in the defaults. Raises ValueError on bad settings.
+# Parameters:
+#   request (dict): The decoded JSON body of a job submission, see Job API
+def getSettings(request):
+    if not isinstance(request, dict):
+        raise ValueError("A job must be a JSON object.")
+    unknown = set(request) - set(["size", "length", "rate", "modifiers", "threshold", "deterministic",
+                                  "maxGenerations", "timeLimit", "seed"])
+    if unknown:
+        raise ValueError("Unknown job settings: " + ", ".join(sorted(unknown)))
+    if "size" not in request or "length" not in request:
+        raise ValueError("A job needs a size and a length.")
+
+    settings = {"rate": 0.01, "modifiers": [1.0] * 9, "threshold": 1.0, "deterministic": True,
+                "maxGenerations": DEFAULT_MAX_GENERATIONS, "timeLimit": None, "seed": None}
+    settings.update(request)
+    if not isInteger(settings["size"]) or settings["size"] < 2:
+        raise ValueError("Size of population must be an integer greater than 1.")
+    if not isInteger(settings["length"]) or settings["length"] < 1:
+        raise ValueError("Length of DNA must be an integer greater than 0.")
+    if not isNumber(settings["rate"]) or not 0.0 <= settings["rate"] <= 1.0:
+        raise ValueError("Mutation rate must be between 0.0 and 1.0.")
+    if not isinstance(settings["modifiers"], list) or len(settings["modifiers"]) != 9:
+        raise ValueError("Modifiers must be exactly 9 elements long.")
+    valid = all([isNumber(modifier) and modifier >= 0 for modifier in settings["modifiers"]])
+    if not valid or sum(settings["modifiers"]) <= 0:
+        raise ValueError("Modifiers must be numbers of at least 0, not all 0.")
+    if not isNumber(settings["threshold"]):
+        raise ValueError("Threshold must be a number.")
+    if not isInteger(settings["maxGenerations"]) or settings["maxGenerations"] < 1:
+        raise ValueError("Maximum number of generations must be an integer greater than 0.")
+    if settings["timeLimit"] is not None and not isNumber(settings["timeLimit"]):
+        raise ValueError("Time limit must be a number of seconds.")
+    if settings["seed"] is not None and not isInteger(settings["seed"]):
+        raise ValueError("Seed must be an integer.")
+    if not isinstance(settings["deterministic"], bool):
+        raise ValueError("Deterministic must be true or false.")
+    return settings
+
+
+###########################################################################
+#                              Job Manager                                #
+###########################################################################
+
+class Job:
+    # Description:
+    #   A submitted job, as seen by the server. Guarded by its changed condition.
+    def __init__(self, id, settings):
+        self.id = id
+        self.settings = settings
+        self.state = "queued"
+        self.records = [] # Each generation's record, in order. Dropped once the job is finished.
+        self.last = None  # The record of the last generation, kept after records are dropped
+        self.result = None
+        self.midi = None
+        self.error = None
+        self.cancelled = False
+        self.changed = threading.Condition() # Notified whenever any of the above changes
+
+    def isFinished(self):
+        return self.state in ("done", "failed", "cancelled")
+
+    # Description:
+    #   Return { id ; state ; generation ; fitness ; result ; error }, fitness being that of the last generation
+    def getStatus(self):
+        with self.changed:
+            last = self.last
+            return {"id": self.id,
+                    "state": self.state,
+                    "generation": last["generation"] if last is not None else 0,
+                    "fitness": last["fitness"] if last is not None else None,
+                    "result": self.result,
+                    "error": self.error}
+
+class JobManager:
+
+    # Description:
+    #   Create a job manager
+    # Parameters:
+    #   processes (number) - optional: The most jobs evolving at once, each in its own process
+    #   maxQueued (number) - optional: The most jobs waiting for a process, further submissions are refused
+    #   maxFinished (number) - optional: The most finished jobs kept for their status and MIDI,
+    #                                    the longest finished ones are forgotten first
+    def __init__(self, processes=2, maxQueued=64, maxFinished=256):
+        if processes < 1:
+            raise ValueError("Number of job processes must be at least 1.")
+        if maxFinished < 1:
+            raise ValueError("Number of finished jobs kept must be at least 1.")
+
+        self.processes = processes
+        self.maxQueued = maxQueued
+        self.maxFinished = maxFinished
+        self.jobs = {}
+        self.__finished = collections.deque() # Ids of the finished jobs still kept, the longest finished first
+        self.__ids = itertools.count(1)
+        self.__slots = threading.Semaphore(processes)
+        self.__lock = threading.Lock()
+
+    # Description:
+    #   Queue a job, return it. Raises ValueError on bad settings and RuntimeError when the queue is full.
+    # Parameters:
+    #   request (dict): The job's settings, see getSettings()
+    def submit(self, request):
+        settings = getSettings(request)
+        with self.__lock:
+            queued = len([job for job in self.jobs.values() if job.state == "queued"])
+            if queued >= self.maxQueued:
+                raise RuntimeError("Too many jobs queued, try again later.")
+            job = Job(str(next(self.__ids)), settings)
+            self.jobs[job.id] = job
+
+        thread = threading.Thread(target=self.__run, args=(job,))
+        thread.daemon = True
+        thread.start()
+        return job
+
+    def get(self, id):
+        with self.__lock:
+            return self.jobs.get(id)
+
+    # Description:
+    #   Cancel a job. A queued job is dropped at once, a running one once its process is killed.
+    def cancel(self, job):
+        with job.changed:
+            if job.isFinished():
+                return
+            job.cancelled = True
+            if job.state == "queued":
+                job.state = "cancelled"
+            job.changed.notify_all()
+
+    # Description:
+    #   Wait for a process slot, run the job in its own process and relay what it sends until it finishes
+    def __run(self, job):
+        self.__slots.acquire()
+        try:
+            with job.changed:
+                if job.cancelled:
+                    return
+                job.state = "running"
+                job.changed.notify_all()
+
+            queue = multiprocessing.Queue()
+            process = multiprocessing.Process(target=runJob, args=(job.settings, queue))
+            process.daemon = True
+            process.start()
+            try:
+                self.__relay(job, queue, process)
+            finally:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+        finally:
+            self.__slots.release()
+            self.__retire(job)
+
+    # Description:
+    #   Drop a finished job's records, forget the longest finished jobs beyond maxFinished
+    def __retire(self, job):
+        with job.changed:
+            # Progress streams still sending hold on to the list itself, see JobHandler.streamProgress()
+            job.records = []
+        with self.__lock:
+            self.__finished.append(job.id)
+            while len(self.__finished) > self.maxFinished:
+                del self.jobs[self.__finished.popleft()]
+
+    def __relay(self, job, queue, process):
+        while True:
+            try:
+                message = queue.get(timeout=POLL_INTERVAL)
+            except Queue.Empty:
+                message = None
+
+            with job.changed:
+                if job.cancelled:
+                    job.state = "cancelled"
+                elif message is not None and message[0] == "progress":
+                    job.records.append(message[1])
+                    job.last = message[1]
+                elif message is not None and message[0] == "done":
+                    job.result = message[1]
+                    job.midi = message[2]
+                    job.state = "done"
+                elif message is not None:
+                    job.error = message[1]
+                    job.state = "failed"
+                elif not process.is_alive() and queue.empty():
+                    job.error = "Job process exited with code " + str(process.exitcode)
+                    job.state = "failed"
+                job.changed.notify_all()
+                if job.isFinished():
+                    return
+
+
+###########################################################################
+#                              HTTP Server                                #
+###########################################################################
+
+class JobHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            return self.sendJson(404, {"error": "Not found."})
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.getheader("Content-Length", 0))))
+            job = self.server.manager.submit(request)
+        except ValueError as error:
+            return self.sendJson(400, {"error": str(error)})
+        except RuntimeError as error:
+            return self.sendJson(503, {"error": str(error)})
+        self.sendJson(201, {"id": job.id})
+
+    def do_GET(self):
+        job, action = self.getJob()
+        if job is None:
+            return
+        if action is None:
+            self.sendJson(200, job.getStatus())
+        elif action == "progress":
+            self.streamProgress(job)
+        elif action == "midi":
+            if job.state != "done":
+                return self.sendJson(409, {"error": "Job is " + job.state + "."})
+            self.send(200, "audio/midi", job.midi)
+        else:
+            self.sendJson(404, {"error": "Not found."})
+
+    def do_DELETE(self):
+        job, action = self.getJob()
+        if job is None:
+            return
+        if action is not None:
+            return self.sendJson(404, {"error": "Not found."})
+        self.server.manager.cancel(job)
+        self.sendJson(200, job.getStatus())
+
+    # Description:
+    #   Return (job, action) of a /jobs/<id>[/<action>] path, answering 404 and returning (None, None) for no job
+    def getJob(self):
+        parts = self.path.strip("/").split("/")
+        job = self.server.manager.get(parts[1]) if len(parts) in (2, 3) and parts[0] == "jobs" else None
+        if job is None:
+            self.sendJson(404, {"error": "No such job."})
+            return None, None
+        return job, parts[2] if len(parts) == 3 else None
+
+    # Description:
+    #   Write each generation's record as a line of JSON as soon as it arrives, the job's status last.
+    #   The connection is closed at the end, so no length is needed.
+    def streamProgress(self, job):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        with job.changed:
+            # The job's records are dropped once it is finished, keep sending from the list this stream started on
+            allRecords = job.records
+        sent = 0
+        try:
+            while True:
+                with job.changed:
+                    while sent == len(allRecords) and not job.isFinished():
+                        job.changed.wait(1.0)
+                    records = allRecords[sent:]
+                    finished = job.isFinished()
+                for record in records:
+                    self.wfile.write(json.dumps(record) + "\n")
+                self.wfile.flush()
+                sent += len(records)
+                if finished:
+                    self.wfile.write(json.dumps(job.getStatus()) + "\n")
+                    return
+        except socket.error:
+            # The client went away, the job carries on
+            return
+
+    def sendJson(self, code, value):
+        self.send(code, "application/json", json.dumps(value))
+
+    def send(self, code, contentType, body):
+        self.send_response(code)
+        self.send_header("Content-Type", contentType)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPServer.BaseHTTPRequestHandler.log_message(self, format, *args)
+
+class JobServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True # Streaming connections must not hold up shutting down
+
+    # Description:
+    #   Create a job server, call serve_forever() to run it
+    # Parameters:
+    #   address ((string, number)): The host and port to listen on, port 0 picks a free one
+    #   manager (JobManager) - optional: Runs the jobs, one with the default limits by default
+    #   verbose (boolean) - optional: Whether to log each request to stderr
+    def __init__(self, address, manager=None, verbose=False):
+        BaseHTTPServer.HTTPServer.__init__(self, address, JobHandler)
+        self.manager = manager if manager is not None else JobManager()
+        self.verbose = verbose
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve score generation jobs over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="The address to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="The port to listen on")
+    parser.add_argument("--processes", type=int, default=2, help="The most jobs evolving at once")
+    parser.add_argument("--max-queued", type=int, default=64, help="The most jobs waiting for a process")
+    parser.add_argument("--max-finished", type=int, default=256,
+                        help="The most finished jobs kept for their status and MIDI")
+    parser.add_argument("--verbose", action="store_true", help="Log each request")
+    args = parser.parse_args()
+
+    server = JobServer((args.host, args.port), JobManager(args.processes, args.max_queued, args.max_finished), args.verbose)
+    print >> sys.stderr, "Serving score generation jobs on http://%s:%d/jobs" % server.server_address[:2]
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+###############################################################################
+##  Name:    Joshua Becker                                                   ##
+##                                                                           ##
+##  Description: Per-generation timing and counting instrumentation.         ##
+##               Population and ScoreAnalyzer time their phases through a    ##
+##               Metrics object. NullMetrics, the default, does nothing.     ##
+###############################################################################
+
+import json
+import time
+
+class PhaseTimer:
+    # Description:
+    #   Times one phase each time it is entered, adding the time to its Metrics
+    def __init__(self, metrics, phase):
+        self.metrics = metrics
+        self.phase = phase
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.metrics.addTime(self.phase, time.time() - self.start)
+        return False
+
+class Metrics:
+
+    # Description:
+    #   Create an enabled metrics collector
+    # Parameters:
+    #   output (file) - optional: Where to write each generation's record as a line of JSON
+    def __init__(self, output=None):
+        self.output = output
+        self.timings = {}  # Phase -> seconds, for the generation in progress
+        self.counters = {} # Counter -> count, for the generation in progress
+        self.totals = {"timings": {}, "counters": {}, "generations": 0} # Summed over every ended generation
+        self.last = None   # The record of the last ended generation, see endGeneration()
+        self.__timers = {}
+
+    # Description:
+    #   Return a context manager timing a phase, eg. with metrics.time("selection"): ...
+    def time(self, phase):
+        timer = self.__timers.get(phase)
+        if timer is None:
+            timer = self.__timers[phase] = PhaseTimer(self, phase)
+        return timer
+
+    def addTime(self, phase, seconds):
+        self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+
+    def count(self, counter, amount=1):
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    # Description:
+    #   Close the record of a generation: { generation ; timings ; counters }, written out if there is an output
+    # Parameters:
+    #   generation (number): The number of the generation that was bred
+    def endGeneration(self, generation):
+        self.last = {"generation": generation, "timings": self.timings, "counters": self.counters}
+        for name, values in (("timings", self.timings), ("counters", self.counters)):
+            totals = self.totals[name]
+            for key in values:
+                totals[key] = totals.get(key, 0) + values[key]
+        self.totals["generations"] += 1
+        self.timings = {}
+        self.counters = {}
+
+        if self.output is not None:
+            self.output.write(json.dumps(self.last, sort_keys=True) + "\n")
+        return self.last
+
+class NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        return False
+
+NULL_TIMER = NullTimer()
+
+class NullMetrics:
+    # Description:
+    #   Disabled metrics, the same interface as Metrics doing as little as possible
+    def __init__(self):
+        self.totals = {"timings": {}, "counters": {}, "generations": 0}
+        self.last = None
+
+    def time(self, phase):
+        return NULL_TIMER
+
+    def addTime(self, phase, seconds):
+        pass
+
+    def count(self, counter, amount=1):
+        pass
+
+    def endGeneration(self, generation):
+        return None
+
+NULL_METRICS = NullMetrics()
@@ -0,0 +1,96 @@
+###############################################################################
+##  Name:    Joshua Becker                                                   ##
+##                                                                           ##
+##  Description: Writes dataScores (See DNA.py) straight to Standard MIDI    ##
+##               Files, one track for the melody and one for the harmony.    ##
+##               Much faster than building a Music21 stream to export it.    ##
+###############################################################################
+
+import cStringIO
+import struct
+
+TICKS_PER_QUARTER = 480
+VELOCITY = 90
+MELODY_CHANNEL = 0
+HARMONY_CHANNEL = 1
+
+###########################################################################
+#                              Utilities                                  #
+###########################################################################
+
+# Description:
+#   Encode a number as a MIDI variable length quantity
+def encodeVariableLength(value):
+    encoded = chr(value & 0x7F)
+    value >>= 7
+    while value:
+        encoded = chr((value & 0x7F) | 0x80) + encoded
+        value >>= 7
+    return encoded
+
+# Description:
+#   Encode one part of a dataScore as the events of a MIDI track chunk
+# Parameters:
+#   pitches ([midi]): The part's notes, each one MIDI note or a list of them (a chord)
+#   lengths ([number]): The length of each note, as an index 0-15 (See DataScore.py)
+#   rests ([boolean]): Whether each note is a rest
+#   name (string): The name of the track
+#   channel (number): The MIDI channel to play the part on
+def encodeTrack(pitches, lengths, rests, name, channel):
+    events = [encodeVariableLength(0), "\xFF\x03", encodeVariableLength(len(name)), name]
+    noteOn = chr(0x90 | channel)
+    noteOff = chr(0x80 | channel)
+    velocity = chr(VELOCITY)
+
+    delta = 0 # Ticks since the last event, rests only push the next event back
+    for midi, length, rest in zip(pitches, lengths, rests):
+        ticks = (length + 1) * TICKS_PER_QUARTER // 4
+        if rest:
+            delta += ticks
+            continue
+
+        # Sound each pitch of a chord once, a repeated note-on would leave a note hanging
+        chordPitches = sorted(set(midi)) if isinstance(midi, list) else [midi]
+        for pitch in chordPitches:
+            events.append(encodeVariableLength(delta) + noteOn + chr(pitch) + velocity)
+            delta = 0
+        delta = ticks
+        for pitch in chordPitches:
+            events.append(encodeVariableLength(delta) + noteOff + chr(pitch) + "\x00")
+            delta = 0
+
+    events.append(encodeVariableLength(delta) + "\xFF\x2F\x00")
+    track = "".join(events)
+    return "MTrk" + struct.pack(">I", len(track)) + track
+
+
+###########################################################################
+#                              Exporting                                  #
+###########################################################################
+
+# Description:
+#   Write a dataScore as a two track Standard MIDI File, chunk by chunk
+# Parameters:
+#   dataScore (DataScore): The score to write, see DNA.generateDataScore()
+#   output (string or file): A path to write to, or an open binary file-like object
+def writeMidi(dataScore, output):
+    if isinstance(output, basestring):
+        with open(output, "wb") as midiFile:
+            writeMidi(dataScore, midiFile)
+        return
+
+    # Format 1: simultaneous tracks
+    output.write("MThd" + struct.pack(">IHHH", 6, 1, 2, TICKS_PER_QUARTER))
+    output.write(encodeTrack(dataScore.melody.tolist(), dataScore.melodyLength.tolist(), dataScore.melodyRest.tolist(),
+                             "melody", MELODY_CHANNEL))
+    output.write(encodeTrack(dataScore.chords.tolist(), dataScore.harmonyLength.tolist(), dataScore.harmonyRest.tolist(),
+                             "harmony", HARMONY_CHANNEL))
+
+# Description:
+#   Return a dataScore as the bytes of a two track Standard MIDI File
+# Parameters:
+#   dataScore (DataScore): The score to write, see DNA.generateDataScore()
+def getMidi(dataScore):
+    buffer = cStringIO.StringIO()
+    writeMidi(dataScore, buffer)
+    return buffer.getvalue()
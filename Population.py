@@ -3,11 +3,111 @@
 ##                                                                           ##
 ##  Description: An abstraction of our breeding population.                  ##
 ##               Effectively just a fancy collection of DNA.                 ##
+##               The genomes of the whole populace are held in one uint8     ##
+##               matrix, one row per DNA, so each generation is bred with    ##
+##               batched array operations.                                   ##
 ###############################################################################
 
 import DNA
-import random
+import FitnessCache
+import Metrics
+import Reporting
+import Selection
+import numpy
 import math
+import multiprocessing
+
+# The fewest children worth shipping to a worker process as one block
+MIN_BLOCK_SIZE = 16
+
+# Each worker process keeps its own fitness cache, see initializeWorker()
+workerCache = None
+
+# Description:
+#   Set up a worker process of the pool
+# Parameters:
+#   cacheSize (number): The capacity of this worker's fitness cache
+def initializeWorker(cacheSize):
+    global workerCache
+    workerCache = FitnessCache.FitnessCache(cacheSize)
+
+# Description:
+#   Score a genome matrix through this worker's cache, return the fitness matrix and the cache hits and misses it took
+def evaluateInWorker(genomes):
+    hits = workerCache.hits
+    misses = workerCache.misses
+    fitness = workerCache.evaluate(genomes)
+    return fitness, workerCache.hits - hits, workerCache.misses - misses
+
+# Description:
+#   Score one block of genomes. Module level so that it may run in a worker process.
+# Parameters:
+#   task (tuple): (genomes, shape), the raw bytes of a genome matrix and its shape
+# Returns:
+#   (fitness, hits, misses), the fitness matrix and the fitness cache hits and misses scoring took
+def evaluateBlock(task):
+    genomes, shape = task
+    genomes = numpy.frombuffer(genomes, dtype=numpy.uint8).reshape(shape)
+    return evaluateInWorker(genomes)
+
+# Description:
+#   Breed and score one block of children. Module level so that it may run in a worker process.
+#   All randomness is drawn beforehand, so the children do not depend on which process breeds them.
+# Parameters:
+#   task (tuple): (parents, shape, mothers, fathers, midpoints, mutations)
+#                 parents (str): The raw bytes of the parent genomes this block needs
+#                 shape ((number, number)): The shape of the parent genome matrix
+#                 mothers, fathers (numpy.ndarray): Row of each child's parents in the parent genome matrix
+#                 midpoints (numpy.ndarray): Crossover midpoint of each child (See DNA.crossover())
+#                 mutations (tuple): (rows, columns, values) to write into the children (See DNA.drawMutations())
+# Returns:
+#   (children, fitness, hits, misses), the raw bytes of the children genome matrix, its fitness matrix
+#   and the fitness cache hits and misses scoring took
+def breedBlock(task):
+    parents, shape, mothers, fathers, midpoints, mutations = task
+    parents = numpy.frombuffer(parents, dtype=numpy.uint8).reshape(shape)
+    children = DNA.crossover(parents[mothers], parents[fathers], midpoints)
+    rows, columns, values = mutations
+    children[rows, columns] = values
+    fitness, hits, misses = evaluateInWorker(children)
+    return children.tobytes(), fitness, hits, misses
+
+# Description:
+#   Return the populace ranks of the parents the deterministic method pairs up for count children.
+#   The fittest breeds with up to sqrt(count) lesser beings, then the next fittest with up to sqrt(what is left)...
+# Parameters:
+#   count (number): The number of children to breed
+# Returns:
+#   (mothers, fathers), the rank (0 being the fittest) of each child's parents
+def getPairing(count):
+    mothers = []
+    fathers = []
+    i = 0
+    while len(mothers) < count:
+        for j in range(0, int(math.sqrt(count - len(mothers)))):
+            if len(mothers) >= count: break
+            mothers.append(i)
+            fathers.append(i + j)
+        i += 1
+    return numpy.array(mothers, dtype=numpy.intp), numpy.array(fathers, dtype=numpy.intp)
+
+# Description:
+#   Return the indices of the count greatest values, greatest first. Equal values keep their index order,
+#   the same as the head of a stable descending sort but only partitioning the rest.
+# Parameters:
+#   values (numpy.ndarray): The values to rank, eg. a weighted fitness array
+#   count (number): The number of indices to return
+def getTopRanks(values, count):
+    if count <= 0:
+        return numpy.empty(0, dtype=numpy.intp)
+    if count >= len(values):
+        return numpy.argsort(-values, kind="mergesort")
+    # The count-th greatest value, everything greater is in and the first of its equals fill up the rest
+    threshold = -numpy.partition(-values, count - 1)[count - 1]
+    greater = numpy.flatnonzero(values > threshold)
+    equal = numpy.flatnonzero(values == threshold)[:count - len(greater)]
+    top = numpy.concatenate((greater, equal))
+    return top[numpy.lexsort((top, -values[top]))]
 
 class Population:
 
@@ -17,24 +117,86 @@ class Population:
     #   size (number): The number of 'strands' of DNA in this populace
     #   length (number): The length of each 'strand' of DNA
     #   rate (number): 0.0-1.0 rate at which a child mutates
-    def __init__(self, size, length, rate=0.01, modifiers=[1.0,1.0,1.0,1.0,1.0,1.0,1.0,1.0,1.0]):
+    #   workers (number) - optional: Number of worker processes to breed and score children with, 0 to stay in this process.
+    #                                Results only depend on the seed, never on workers.
+    #   selection (object) - optional: How the probabilistic method picks parents (See Selection.py),
+    #                                  roulette wheel selection by default. A multi-objective strategy such
+    #                                  as Selection.ParetoSelection also makes this an NSGA-II population:
+    #                                  parents and children compete for the next generation on their Pareto
+    #                                  front, the modifiers only choosing the best child. (See getParetoFront())
+    #   cacheSize (number) - optional: Capacity of the fitness cache (See FitnessCache.py), off (0) by default.
+    #                                  Pays off once children repeat, eg. with the deterministic method,
+    #                                  and costs a little on generations of all new children.
+    #                                  Each worker process keeps a cache of its own of this capacity.
+    #   reporter (Reporter) - optional: Given a record of each generation (See Reporting.py), None to report nothing.
+    #                                   Prints to stdout by default.
+    #   checkpoint (dict) - optional: A checkpoint to resume from instead of starting from random DNA (See Checkpoint.load())
+    #   metrics (Metrics) - optional: Collects the timings and counts of each generation (See Metrics.py), off by default
+    #   elites (number) - optional: The number of fittest DNA carried over unchanged into each generation, fitness and all
+    #   replacement (number) - optional: 0.0-1.0 fraction of the populace replaced by children each generation.
+    #                                    Below 1.0 this is a steady-state population, only the least fit are replaced.
+    #   seed (number) - optional: Seeds the population's own random generator, all of its randomness is drawn from it.
+    #                             By default the seed is drawn from numpy.random. Ignored when resuming a checkpoint.
+    def __init__(self, size, length, rate=0.01, modifiers=[1.0,1.0,1.0,1.0,1.0,1.0,1.0,1.0,1.0], workers=0, selection=None,
+                 cacheSize=0, reporter=Reporting.PrintReporter(), checkpoint=None, metrics=None, elites=0,
+                 replacement=1.0, seed=None):
         if size < 2:
             print "Size of population must be greater than 1"
             return
         if length < 1:
             print "Length of DNA must be greater than 0"
             return
+        if workers < 0:
+            print "Number of workers must not be negative"
+            return
+        if cacheSize < 0:
+            print "Size of the fitness cache must not be negative"
+            return
+        if elites < 0 or elites >= size:
+            print "Number of elites must be at least 0 and smaller than the size of the population"
+            return
+        if replacement <= 0.0 or replacement > 1.0:
+            print "Replacement must be greater than 0.0 and at most 1.0"
+            return
+        if getattr(selection, "multiObjective", False) and (elites > 0 or replacement < 1.0):
+            print "Elites and replacement do not apply to multi-objective selection, it always keeps the best fronts"
+            return
+        if checkpoint is not None and checkpoint["genomes"].shape != (size, length * 8):
+            print "Checkpoint does not match the size and length of the population"
+            return
 
         self.size = size
         self.length = length
         self.rate = rate
-        self.populace = []
-        self.__totalFitness = 0 # The total fitness score of the population, for producing relative probabilities
-
-        for i in range(0, size):
-            newDNA = DNA.DNA(length)
-            self.__totalFitness += newDNA.getFitness(modifiers)
-            self.populace.append(newDNA)
+        self.workers = workers
+        self.selection = selection if selection is not None else Selection.RouletteSelection()
+        self.multiObjective = getattr(self.selection, "multiObjective", False) # See Selection.py
+        self.cache = FitnessCache.FitnessCache(cacheSize)
+        self.reporter = reporter
+        self.metrics = metrics if metrics is not None else Metrics.NULL_METRICS
+        # The fittest DNA surviving each generation, whichever of elitism and steady-state replacement keeps more
+        self.survivors = max(elites, size - int(math.ceil(replacement * size)))
+        self.generation = 0 # The number of generations bred so far
+        self.__pairing = getPairing(size - self.survivors) # Parent ranks of the deterministic method
+        self.__pool = None
+        self.__workerHits = 0 # Fitness cache hits and misses of the worker processes' caches
+        self.__workerMisses = 0
+        # The generator of all this population's randomness, runs do not disturb one another or numpy.random
+        self.random = numpy.random.RandomState(seed if seed is not None else numpy.random.randint(0, 2 ** 31))
+        if checkpoint is not None:
+            self.genomes = checkpoint["genomes"]
+            self.fitness = checkpoint["fitness"]
+            self.generation = checkpoint["generation"]
+            self.random.set_state(checkpoint["random"])
+        else:
+            self.genomes = DNA.randomGenomes(size, length, self.random) # (size, length * 8) matrix, one genome per row
+            self.fitness = self.__evaluate(self.genomes) # (size, 9) fitness matrix, row i belongs to genome i
+        self.__populace = None # DNA wrappers of the genomes, built on demand by getPopulace()
+        self.__ranking = None  # Pareto fronts and crowding distances of the fitness matrix, see getParetoRanking()
+        self.modifiers = None
+        self.weights = None  # Normalized modifiers, see DNA.normalizeModifiers()
+        self.weighted = None # Weighted fitness of each genome, kept until the genomes or modifiers change
+        self.__setModifiers(modifiers)
 
     # Description:
     #   Breed the next generation, return the best child
@@ -45,109 +207,238 @@ class Population:
     #                         In the order of: Motion, consonance, consistency, macroharmony,
     #                         centricity, cohesion, note length, octave, and common notes between chords.
     def getGeneration(self, modifiers, deterministic=False):
+        self.__setModifiers(modifiers)
         if deterministic:
-            return self.__getDeterministic(modifiers)
+            return self.__getDeterministic()
         else:
-            return self.__getProbabilistic(modifiers)
-
-    def __getDeterministic(self, modifiers):
-        self.populace = sorted(self.populace, key=lambda dna: dna.getFitness(modifiers), reverse=True)
-        newPopulace = []
-        fittestChild = None
-        newTotalFitness = 0
-        i = 0
-        while len(newPopulace) < self.size:
-            # Breed this person with up to sqrt(size) lesser beings
-            for j in range(0, int(math.sqrt(self.size - len(newPopulace)))):
-                if len(newPopulace) >= self.size: break
-                parent1 = self.populace[i]
-                parent2 = self.populace[i + j]
-                child = parent1.breed(parent2)
-                child.mutate(self.rate)
-
-                newTotalFitness += child.getFitness(modifiers)
-                newPopulace.append(child)
-
-                if fittestChild is None:
-                    fittestChild = child
-                elif child.getFitness(modifiers) > fittestChild.getFitness(modifiers):
-                    fittestChild = child
-            i += 1
-
-        self.populace = newPopulace
-        self.__totalFitness = newTotalFitness
-        fitnessArray = fittestChild.getFitnessArray()
-        print "---------------------------------------------"
-        print "Cumulative: " + str(fittestChild.getFitness(modifiers))
-        print "    Motion:       " + str(fitnessArray[0])
-        print "    Consonance:   " + str(fitnessArray[1])
-        print "    Consistency:  " + str(fitnessArray[2])
-        print "    Macroharmony: " + str(fitnessArray[3])
-        print "    Centricity:   " + str(fitnessArray[4])
-        print "    Cohesion:     " + str(fitnessArray[5])
-        print "    Note Length:  " + str(fitnessArray[6])
-        print "    Octave:       " + str(fitnessArray[7])
-        print "    Common Notes: " + str(fitnessArray[8])
+            return self.__getProbabilistic()
 
-        return fittestChild
+    # Description:
+    #   Return the weighted fitness of every DNA in the populace as one array, in populace order
+    # Parameters:
+    #   modifiers ([Number]): See getGeneration()
+    def getWeightedFitness(self, modifiers):
+        self.__setModifiers(modifiers)
+        return self.weighted
+
+    def __setModifiers(self, modifiers):
+        modifiers = tuple(modifiers)
+        if modifiers != self.modifiers:
+            self.modifiers = modifiers
+            self.weights = DNA.normalizeModifiers(modifiers)
+            self.weighted = self.fitness.dot(self.weights)
+
+    def __getDeterministic(self):
+        with self.metrics.time("selection"):
+            # Only the ranks the pairing reaches are needed, no need to sort the whole populace
+            motherRanks, fatherRanks = self.__pairing
+            if self.multiObjective:
+                ranking = Selection.paretoOrder(self.getParetoRanking())
+            else:
+                ranking = getTopRanks(self.weighted, fatherRanks.max() + 1)
+            mothers = ranking[motherRanks]
+            fathers = ranking[fatherRanks]
 
-    def __getProbabilistic(self, modifiers):
-        probabilities = []
-        # Produce relative probabilities
-        for dna in self.populace:
-            probabilities.append(dna.getFitness(modifiers) / self.__totalFitness)
+        return self.__breed(mothers, fathers)
 
+    def __getProbabilistic(self):
         # Produce a new population via that whole spooky birds and bees stuff
-        newPopulace = []
-        newTotalFitness = 0
-        fittestChild = None
-        while len(newPopulace) < self.size:
-            rand = random.random()
-            cumulativeProbability = 0
-            parent1 = None
-            for index, value in enumerate(self.populace):
-                cumulativeProbability += probabilities[index]
-                if cumulativeProbability >= rand:
-                    parent1 = self.populace[index]
-                    break
-
-            rand = random.random()
-            cumulativeProbability = 0
-            parent2 = None
-            for index, value in enumerate(self.populace):
-                cumulativeProbability += probabilities[index]
-                if cumulativeProbability >= rand:
-                    parent2 = self.populace[index]
-                    break
-
-            child = parent1.breed(parent2)
-            rand = random.random()
-            child.mutate(self.rate)
-            newTotalFitness += child.getFitness(modifiers)
-            newPopulace.append(child)
-            if fittestChild is None:
-                fittestChild = child
-            elif child.getFitness(modifiers) > fittestChild.getFitness(modifiers):
-                fittestChild = child
-
-        self.populace = newPopulace
-        self.__totalFitness = newTotalFitness
-        fitnessArray = fittestChild.getFitnessArray()
-        print "---------------------------------------------"
-        print "Cumulative: " + str(fittestChild.getFitness(modifiers))
-        print "    Motion:       " + str(fitnessArray[0])
-        print "    Consonance:   " + str(fitnessArray[1])
-        print "    Consistency:  " + str(fitnessArray[2])
-        print "    Macroharmony: " + str(fitnessArray[3])
-        print "    Centricity:   " + str(fitnessArray[4])
-        print "    Cohesion:     " + str(fitnessArray[5])
-        print "    Note Length:  " + str(fitnessArray[6])
-        print "    Octave:       " + str(fitnessArray[7])
-        print "    Common Notes: " + str(fitnessArray[8])
+        with self.metrics.time("selection"):
+            count = 2 * (self.size - self.survivors)
+            if self.multiObjective:
+                parents = self.selection.select(self.fitness, count, self.random, self.getParetoRanking())
+            else:
+                parents = self.selection.select(self.weighted, count, self.random)
+        return self.__breed(parents[0::2], parents[1::2])
+
+    # Description:
+    #   Breed a whole generation at once from the given parents, replace all but the survivors of the populace with it
+    #   and return the best of the new populace
+    # Parameters:
+    #   mothers ([number]): The populace index of the first parent of each child
+    #   fathers ([number]): The populace index of the second parent of each child
+    def __breed(self, mothers, fathers):
+        metrics = self.metrics
+        hits, misses = self.getCacheStats()
+        mothers = numpy.asarray(mothers)
+        fathers = numpy.asarray(fathers)
+        columns = self.genomes.shape[1]
+        with metrics.time("crossover"):
+            midpoints = self.random.randint(0, columns + 1, len(mothers))
+        with metrics.time("mutation"):
+            mutations = DNA.drawMutations(len(mothers), columns, self.rate, self.random)
+
+        if self.workers > 0:
+            with metrics.time("workers"):
+                genomes, fitness = self.__breedInWorkers(mothers, fathers, midpoints, mutations)
+        else:
+            with metrics.time("crossover"):
+                genomes = DNA.crossover(self.genomes[mothers], self.genomes[fathers], midpoints)
+            with metrics.time("mutation"):
+                rows, columns, values = mutations
+                genomes[rows, columns] = values
+            with metrics.time("evaluation"):
+                fitness = self.cache.evaluate(genomes, metrics)
+
+        newHits, newMisses = self.getCacheStats()
+        metrics.count("children", len(genomes))
+        metrics.count("evaluations", newMisses - misses)
+        metrics.count("cacheHits", newHits - hits)
+
+        ranking = None
+        if self.multiObjective:
+            # NSGA-II: parents and children together, the best fronts make up the next generation.
+            # Their fronts and crowding distances are kept for picking the parents of the next one.
+            with metrics.time("selection"):
+                genomes = numpy.concatenate((self.genomes, genomes))
+                fitness = numpy.concatenate((self.fitness, fitness))
+                ranks, distance = Selection.paretoRanking(fitness)
+                kept = Selection.paretoOrder((ranks, distance))[:self.size]
+                genomes = genomes[kept]
+                fitness = fitness[kept]
+                ranking = (ranks[kept], distance[kept])
+            metrics.count("survivors", int((kept < self.size).sum()))
+        elif self.survivors > 0:
+            # Survivors keep their fitness, they are never bred or evaluated again
+            survivors = getTopRanks(self.weighted, self.survivors)
+            genomes = numpy.concatenate((self.genomes[survivors], genomes))
+            fitness = numpy.concatenate((self.fitness[survivors], fitness))
+            metrics.count("survivors", self.survivors)
+        metrics.count("allocatedBytes", genomes.nbytes + fitness.nbytes)
+
+        self.genomes = genomes
+        self.fitness = fitness
+        self.weighted = fitness.dot(self.weights)
+        self.__populace = None
+        self.__ranking = ranking
+        fittestChild = self.__getDNA(numpy.argmax(self.weighted))
+        self.generation += 1
+        metrics.endGeneration(self.generation)
+        if self.reporter is not None:
+            self.reporter.report(Reporting.getRecord(self.generation, fittestChild, self.modifiers))
 
         return fittestChild
 
     # Description:
-    #   Return the current group in the population
+    #   Shard the breeding of a generation across the worker pool, see breedBlock()
+    #   Only the parents a block needs are shipped to it, as raw genome bytes.
+    def __breedInWorkers(self, mothers, fathers, midpoints, mutations):
+        rows, columns, values = mutations
+        tasks = []
+        for start, stop in self.__getBlocks(len(mothers)):
+            parents = numpy.union1d(mothers[start:stop], fathers[start:stop])
+            first, last = numpy.searchsorted(rows, [start, stop])
+            tasks.append((self.genomes[parents].tobytes(), (len(parents), self.genomes.shape[1]),
+                          numpy.searchsorted(parents, mothers[start:stop]),
+                          numpy.searchsorted(parents, fathers[start:stop]),
+                          midpoints[start:stop],
+                          (rows[first:last] - start, columns[first:last], values[first:last])))
+
+        results = self.__getPool().map(breedBlock, tasks)
+        genomes = numpy.frombuffer(b"".join([result[0] for result in results]), dtype=numpy.uint8)
+        genomes = genomes.reshape(len(mothers), self.genomes.shape[1]).copy()
+        fitness = numpy.concatenate([result[1] for result in results])
+        self.__workerHits += sum([result[2] for result in results])
+        self.__workerMisses += sum([result[3] for result in results])
+        return genomes, fitness
+
+    # Description:
+    #   Return the (N, 9) fitness matrix of a genome matrix, scored in one batched pass or sharded across the worker pool.
+    #   Either way genomes already in a fitness cache are not analyzed again.
+    def __evaluate(self, genomes):
+        if self.workers == 0:
+            return self.cache.evaluate(genomes)
+
+        tasks = []
+        for start, stop in self.__getBlocks(len(genomes)):
+            tasks.append((genomes[start:stop].tobytes(), (stop - start, genomes.shape[1])))
+        results = self.__getPool().map(evaluateBlock, tasks)
+        self.__workerHits += sum([result[1] for result in results])
+        self.__workerMisses += sum([result[2] for result in results])
+        return numpy.concatenate([result[0] for result in results])
+
+    # Description:
+    #   Split count children into contiguous (start, stop) blocks, a few per worker to even out the load
+    def __getBlocks(self, count):
+        blockSize = max(MIN_BLOCK_SIZE, int(math.ceil(count / (self.workers * 4.0))))
+        return [(start, min(start + blockSize, count)) for start in range(0, count, blockSize)]
+
+    def __getPool(self):
+        if self.__pool is None:
+            self.__pool = multiprocessing.Pool(self.workers, initializeWorker, (self.cache.capacity,))
+        return self.__pool
+
+    # Description:
+    #   Shut down the worker pool, if any. The population may still be used afterwards, a new pool is started on demand.
+    def close(self):
+        if self.__pool is not None:
+            self.__pool.terminate()
+            self.__pool.join()
+            self.__pool = None
+
+    # Description:
+    #   Wrap a row of the genome matrix in a DNA. Its data is a read-only view, DNA.mutate() copies it before writing,
+    #   so the genome and fitness matrices can never go out of step.
+    def __getDNA(self, index):
+        data = self.genomes[index]
+        data.setflags(write=False)
+        return DNA.DNA(self.length, data, self.fitness[index], self.cache)
+
+    # Description:
+    #   Return the current group in the population, as DNA built the first time it is asked for
     def getPopulace(self):
-        return self.populace
+        if self.__populace is None:
+            self.__populace = [self.__getDNA(i) for i in range(0, len(self.genomes))]
+        return self.__populace
+
+    # Description:
+    #   Return the mean Hamming distance from each genome to the fittest one, as a fraction of the genome length.
+    #   0.0 once the population has collapsed onto a single genome.
+    def getDiversity(self):
+        fittest = self.genomes[numpy.argmax(self.weighted)]
+        return float((self.genomes != fittest).mean())
+
+    # Description:
+    #   Return copies of the genome and fitness matrices of the count fittest DNA, fittest first
+    # Parameters:
+    #   count (number): The number of DNA to return
+    def getFittest(self, count):
+        fittest = getTopRanks(self.weighted, count)
+        return self.genomes[fittest].copy(), self.fitness[fittest].copy()
+
+    # Description:
+    #   Return copies of the genome and fitness matrices of the Pareto front of the populace, the DNA no other DNA
+    #   beats in every fitness component. Under any non-negative modifiers the fittest DNA is as fit as one on it,
+    #   so one run serves many weightings: front[1].dot(DNA.normalizeModifiers(modifiers)).argmax()
+    def getParetoFront(self):
+        front = numpy.flatnonzero(self.getParetoRanking()[0] == 0)
+        return self.genomes[front].copy(), self.fitness[front].copy()
+
+    # Description:
+    #   Return (ranks, distance), the Pareto front and crowding distance of each DNA (See Selection.paretoRanking()).
+    #   A multi-objective population keeps those its last generation was truncated with, otherwise they are computed.
+    def getParetoRanking(self):
+        if self.__ranking is None:
+            self.__ranking = Selection.paretoRanking(self.fitness)
+        return self.__ranking
+
+    # Description:
+    #   Replace the least fit DNA of the populace, eg. with migrants from another population
+    # Parameters:
+    #   genomes (numpy.ndarray): The genome matrix of the newcomers
+    #   fitness (numpy.ndarray): Their fitness matrix
+    def replaceWeakest(self, genomes, fitness):
+        weakest = numpy.argsort(self.weighted, kind="mergesort")[:len(genomes)]
+        # DNA handed out are views onto these matrices, replace them rather than writing into them
+        self.genomes = self.genomes.copy()
+        self.fitness = self.fitness.copy()
+        self.genomes[weakest] = genomes
+        self.fitness[weakest] = fitness
+        self.weighted = self.fitness.dot(self.weights)
+        self.__populace = None
+        self.__ranking = None
+
+    # Description:
+    #   Return (hits, misses) of the fitness cache, worker processes' caches included
+    def getCacheStats(self):
+        return (self.cache.hits + self.__workerHits, self.cache.misses + self.__workerMisses)
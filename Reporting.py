@@ -0,0 +1,52 @@
+###############################################################################
+##  Name:    Joshua Becker                                                   ##
+##                                                                           ##
+##  Description: Per-generation reporting hooks for Population.              ##
+##               A reporter is given one record per generation:              ##
+##               { generation: number ; fitness: number ;                    ##
+##                 fitnessArray: [number] }                                  ##
+###############################################################################
+
+import time
+
+# The characteristics of a fitness array, in order (See ScoreAnalyzer.getAnalysisScore())
+FITNESS_NAMES = ["Motion", "Consonance", "Consistency", "Macroharmony", "Centricity",
+                 "Cohesion", "Note Length", "Octave", "Common Notes"]
+
+# Description:
+#   Build the record of a generation
+# Parameters:
+#   generation (number): The number of generations bred so far
+#   fittestChild (DNA): The best child of the generation
+#   modifiers ([Number]): The modifiers the generation was bred with
+def getRecord(generation, fittestChild, modifiers):
+    return {"generation": generation,
+            "fitness": fittestChild.getFitness(modifiers),
+            "fitnessArray": [float(value) for value in fittestChild.getFitnessArray()]}
+
+class PrintReporter:
+    # Description:
+    #   Print the fitness of each generation's best child to stdout
+    def report(self, record):
+        print "---------------------------------------------"
+        print "Cumulative: " + str(record["fitness"])
+        for name, value in zip(FITNESS_NAMES, record["fitnessArray"]):
+            print "    " + (name + ":").ljust(14) + str(value)
+
+class RateLimitedReporter:
+    # Description:
+    #   Create a reporter passing records on to a callback at most once per interval
+    # Parameters:
+    #   callback (function): Called with each record that is not dropped
+    #   interval (number) - optional: The fewest seconds between two calls to callback
+    def __init__(self, callback, interval=1.0):
+        self.callback = callback
+        self.interval = interval
+        self.__lastReport = None
+
+    def report(self, record):
+        now = time.time()
+        if self.__lastReport is not None and now - self.__lastReport < self.interval:
+            return
+        self.__lastReport = now
+        self.callback(record)
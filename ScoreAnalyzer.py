@@ -7,7 +7,9 @@
 ##               Music21 score as one may suspect                            ##
 ###############################################################################
 
-from music21 import *
+import DataScore
+import Metrics
+import math
 import numpy
 import sys
 
@@ -64,8 +66,7 @@ def analyzeHarmonicConsonance(harmony):
         for note2 in chord[0]:
             if note1 is note2: continue
             totalIntervals += 1
-            thisInterval = abs(note1 - note2) % 12
-            cumulativeScore += INTERVAL_SCORES[thisInterval]
+            cumulativeScore += CONSONANCE_LOOKUP[note1][note2]
 
     return cumulativeScore / totalIntervals
 
@@ -75,19 +76,16 @@ def analyzeHarmonicConsonance(harmony):
 # Parameters:
 #   harmony (music21 Part): The harmony to be analyzed
 def analyzeHarmonicConsistency(harmony):
-    structures = [[0 for i in range(12)] for j in range(12)]
+    counts = [0.0] * 144
     totalStructures = 0.01
 
     # Find the structures
     for chord in harmony:
         if chord[0] == -1: continue
-        interval1 = abs(chord[0][0] - chord[0][1]) % 12
-        interval2 = abs(chord[0][0] - chord[0][2]) % 12
-        if interval1 > interval2:
-            structures[interval1][interval2] += 1.0
-        else:
-            structures[interval2][interval1] += 1.0
+        root = INTERVAL_LOOKUP[chord[0][0]]
+        counts[STRUCTURE_LOOKUP[root[chord[0][1]]][root[chord[0][2]]]] += 1.0
         totalStructures += 1
+    structures = [counts[i:i + 12] for i in range(0, 144, 12)]
 
     # Find the most common structures
     mostCommon = [0.0, 0.0, 0.0, 0.0, 0.0]
@@ -123,45 +121,56 @@ def analyzeHarmonicConsistency(harmony):
 # line in Dmitri's book "Tonal music tends to use relatively small macroharmonies, often involving five to eight notes."
 MACRO_SCORES = [0.0, 0.1, 0.15, 0.25, 0.5, 0.65, 0.8, 1.0, 0.8, 0.65, 0.5, 0.25, 0.0 ]
 # Description:
-#   Give this harmony a 0.0-1.0 score based on its macroharmonic makeup
+#   Count the pitch classes of the melody notes and chord notes, rests excluded.
+#   Computed once per score and shared by analyzeMacroharmony() and analyzeCentricity()
 # Parameters:
 #   melody (music21 Part): The melody to be analyzed
 #   harmony (music21 Part): The harmony to be analyzed
-def analyzeMacroharmony(melody, harmony):
+def getPitchClassHistogram(melody, harmony):
     notesUsed = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
     for note in melody:
         if note[0] == -1: continue
-        index = note[0] % 12
-        notesUsed[index] += 1
+        notesUsed[PITCH_CLASSES[note[0]]] += 1
     for chord in harmony:
         if chord[0] == -1: continue
         for note in chord[0]:
-            index = note % 12
-            notesUsed[index] += 1
+            notesUsed[PITCH_CLASSES[note]] += 1
+    return notesUsed
 
+# Description:
+#   Give this harmony a 0.0-1.0 score based on its macroharmonic makeup
+# Parameters:
+#   melody (music21 Part): The melody to be analyzed
+#   harmony (music21 Part): The harmony to be analyzed
+#   notesUsed ([number]) - optional: The pitch class histogram of melody and harmony, see getPitchClassHistogram()
+def analyzeMacroharmony(melody, harmony, notesUsed=None):
+    if notesUsed is None:
+        notesUsed = getPitchClassHistogram(melody, harmony)
+    return getMacroharmonyScore(notesUsed)
 
-    avg = numpy.mean(notesUsed)
-    std = numpy.std(notesUsed)
+# Description:
+#   analyzeMacroharmony() of a pitch class histogram. Mean and standard deviation are worked out
+#   directly over the 12 counts, converting such a tiny list to numpy costs more than the arithmetic.
+# Parameters:
+#   notesUsed ([number]): A pitch class histogram, see getPitchClassHistogram()
+def getMacroharmonyScore(notesUsed):
+    avg = sum(notesUsed) / 12.0
+    std = math.sqrt(sum([(value - avg) ** 2 for value in notesUsed]) / 12.0)
 
     # If a note is used fewer than two StdDevs below the mean, treat it like None
     # Are used, but add a slight negative modifier
     # NOTE: This is my attempt to make this score less discrete
     twoStdDevs = avg - 2 * std
     oneStdDev = avg - std
-    i = 0
     mod = 1
-    while i < len(notesUsed):
-        if notesUsed[i] < twoStdDevs:
-            notesUsed[i] = 0
-            mod -= 0.05
-        elif notesUsed[i] < oneStdDev:
-            notesUsed[i] = 0
-            mod -= 0.10
-        i += 1
-
     numberNotesUsed = 0
     for value in notesUsed:
-        if value > 0: numberNotesUsed += 1
+        if value < twoStdDevs:
+            mod -= 0.05
+        elif value < oneStdDev:
+            mod -= 0.10
+        elif value > 0:
+            numberNotesUsed += 1
 
     return MACRO_SCORES[numberNotesUsed] * mod
 
@@ -170,21 +179,19 @@ def analyzeMacroharmony(melody, harmony):
 # Parameters:
 #   melody (music21 Part): The melody to be analyzed
 #   harmony (music21 Part): The harmony to be analyzed
-def analyzeCentricity(melody, harmony):
-    notesUsed = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
-    totalNotes = 0.1 # Set this to 0.1 to avoid incredibly improbable error due to division by zero TODO: More elegant fix?
-    for note in melody:
-        if note[0] == -1: continue
-        index = note[0] % 12
-        notesUsed[index] += 1.0
-        totalNotes += 1.0
+#   notesUsed ([number]) - optional: The pitch class histogram of melody and harmony, see getPitchClassHistogram()
+def analyzeCentricity(melody, harmony, notesUsed=None):
+    if notesUsed is None:
+        notesUsed = getPitchClassHistogram(melody, harmony)
+    return getCentricityScore(notesUsed)
+
+# Description:
+#   analyzeCentricity() of a pitch class histogram
+# Parameters:
+#   notesUsed ([number]): A pitch class histogram, see getPitchClassHistogram()
+def getCentricityScore(notesUsed):
     # TODO: Base it off the chord, not the notes of the chord?
-    for chord in harmony:
-        if chord[0] == -1: continue
-        for note in chord[0]:
-            index = note % 12
-            notesUsed[index] += 1.0
-            totalNotes += 1.0
+    totalNotes = 0.1 + sum(notesUsed) # Set this to 0.1 to avoid incredibly improbable error due to division by zero
     # Convert to relative frequencies
     maxFreq = 0.1
     secondFreq = 0.1 # Set this to 0.1 to avoid incredibly improbable error due to division by zero TODO: More elegant fix?
@@ -199,7 +206,6 @@ def analyzeCentricity(melody, harmony):
     return 1 - (secondFreq / maxFreq)
 
 
-
 COHESION_SCORES = [1, 0.25, 0.25, 0.75, 0.75, 0.5, 0.25, 1, 0.5, 0.5, 0.75, 1]
 
 # Description:
@@ -227,9 +233,9 @@ def analyzeCohesion(melody, harmony):
             i += 1
             continue
 
+        cohesion = COHESION_LOOKUP[melodyNote]
         for note in chordNotes:
-            interval = abs(melodyNote - note) % 12
-            cumulativeScore += COHESION_SCORES[interval]
+            cumulativeScore += cohesion[note]
             totalIntervals += 1
         i += 1
         # If the melody has progressed beyond the chord, iterate chord
@@ -297,7 +303,7 @@ def analyzeOctave(melody, harmony):
     for chord in harmony:
         if chord[0] == -1: continue
         for note in chord[0]:
-            octave = note / 12
+            octave = OCTAVES[note]
             octaveSums[octave] += 1
             totalNotes += 1
 
@@ -333,11 +339,11 @@ def analyzeCommonNotes(harmony):
         untuple2 = [chord2[0][0], chord2[0][1], chord2[0][2]]
         untuple2.sort()
 
-        if (untuple1[0] % 12) == (untuple2[0] % 12):
+        if PITCH_CLASSES[untuple1[0]] == PITCH_CLASSES[untuple2[0]]:
             score += 1
-        if (untuple1[1] % 12) == (untuple2[1] % 12):
+        if PITCH_CLASSES[untuple1[1]] == PITCH_CLASSES[untuple2[1]]:
             score += 1
-        if (untuple1[2] % 12) == (untuple2[2] % 12):
+        if PITCH_CLASSES[untuple1[2]] == PITCH_CLASSES[untuple2[2]]:
             score += 1
 
         i += 1
@@ -346,6 +352,50 @@ def analyzeCommonNotes(harmony):
     return score / (totalChords * 3)
 
 
+###########################################################################
+#                              Lookup Tables                              #
+###########################################################################
+
+# Every note is 7 bits, so everything the heuristics derive from one or two notes is tabulated once here.
+# The numpy tables serve the batch analysis and are read-only, so forked worker processes share their pages.
+# The nested tuples hold the same values for the scalar heuristics, indexing numpy from Python being slow.
+
+def readOnly(table):
+    table.setflags(write=False)
+    return table
+
+def toLookup(table):
+    if table.ndim == 1:
+        return tuple(table.tolist())
+    return tuple([toLookup(row) for row in table])
+
+INTERVAL_SCORE_ARRAY = readOnly(numpy.array(INTERVAL_SCORES, dtype=float))
+COHESION_SCORE_ARRAY = readOnly(numpy.array(COHESION_SCORES, dtype=float))
+MACRO_SCORE_ARRAY = readOnly(numpy.array(MACRO_SCORES, dtype=float))
+
+MIDI = numpy.arange(128)
+# MIDI note -> pitch class, and MIDI note -> octave
+PITCH_CLASS_TABLE = readOnly(MIDI % 12)
+OCTAVE_TABLE = readOnly(MIDI // 12)
+# (MIDI note, MIDI note) -> interval class, and its scores
+INTERVAL_CLASS_TABLE = readOnly(numpy.abs(MIDI[:, None] - MIDI[None, :]) % 12)
+CONSONANCE_TABLE = readOnly(INTERVAL_SCORE_ARRAY[INTERVAL_CLASS_TABLE])
+COHESION_TABLE = readOnly(COHESION_SCORE_ARRAY[INTERVAL_CLASS_TABLE])
+# (interval class root to second note, interval class root to third note) -> chord structure 0-143,
+# the larger interval class first (See analyzeHarmonicConsistency()). A triad's structure is
+# STRUCTURE_TABLE[INTERVAL_CLASS_TABLE[root, second], INTERVAL_CLASS_TABLE[root, third]].
+INTERVAL_CLASSES = numpy.arange(12)
+STRUCTURE_TABLE = readOnly(numpy.maximum(INTERVAL_CLASSES[:, None], INTERVAL_CLASSES[None, :]) * 12 +
+                           numpy.minimum(INTERVAL_CLASSES[:, None], INTERVAL_CLASSES[None, :]))
+
+PITCH_CLASSES = toLookup(PITCH_CLASS_TABLE)
+OCTAVES = toLookup(OCTAVE_TABLE)
+INTERVAL_LOOKUP = toLookup(INTERVAL_CLASS_TABLE)
+CONSONANCE_LOOKUP = toLookup(CONSONANCE_TABLE)
+COHESION_LOOKUP = toLookup(COHESION_TABLE)
+STRUCTURE_LOOKUP = toLookup(STRUCTURE_TABLE)
+
+
 ###########################################################################
 #                         Score Analyzer Class                            #
 ###########################################################################
@@ -369,11 +419,494 @@ class ScoreAnalyzer:
         motion = analyzeMelodicMotion(self.melody)
         consonance = analyzeHarmonicConsonance(self.harmony)
         consistency = analyzeHarmonicConsistency(self.harmony)
-        macroharmony = analyzeMacroharmony(self.melody, self.harmony)
-        centricity = analyzeCentricity(self.melody, self.harmony)
+        notesUsed = getPitchClassHistogram(self.melody, self.harmony)
+        macroharmony = analyzeMacroharmony(self.melody, self.harmony, notesUsed)
+        centricity = analyzeCentricity(self.melody, self.harmony, notesUsed)
         cohesion = analyzeCohesion(self.melody, self.harmony)
         noteLength = analyzeNoteLength(self.melody, self.harmony)
         octave = analyzeOctave(self.melody, self.harmony)
         commonNotes = analyzeCommonNotes(self.harmony)
 
         return [motion, consonance, consistency, macroharmony, centricity, cohesion, noteLength, octave, commonNotes]
+
+
+###########################################################################
+#                         Score Statistics Class                          #
+###########################################################################
+
+# Description:
+#   Return the 8-byte record of note i of a genome as a list of ints
+# Parameters:
+#   data ([7bits]): A genome, see DNA.py
+#   i (number): The index of the note
+def getNoteRecord(data, i):
+    record = data[i * 8:i * 8 + 8]
+    if isinstance(record, numpy.ndarray):
+        return record.tolist()
+    return record
+
+# Description:
+#   Analyze a genome in one pass over its note records, without decoding it to a dataScore.
+#   Returns the same array of scores as ScoreAnalyzer.getAnalysisScore() would.
+# Parameters:
+#   data ([7bits]): A genome, see DNA.py
+def analyzeGenome(data):
+    return ScoreStatistics(data).getAnalysisScore()
+
+class ScoreStatistics:
+
+    # Description:
+    #   Gather the sufficient statistics of the above heuristics for a genome.
+    #   Where getAnalysisScore() re-reads the whole score, these may be updated in place when only a few notes change,
+    #   in time proportional to the changed notes rather than the length of the score.
+    # Parameters:
+    #   data ([7bits]): A genome, see DNA.py
+    def __init__(self, data):
+        if isinstance(data, numpy.ndarray):
+            data = data.tolist()
+
+        self.notes = len(data) // 8
+        self.melodyNotes = 0               # Number of melody notes that are not rests
+        self.totalDistance = 0             # Summed jumps between consecutive melody notes, see analyzeMelodicMotion()
+        self.consonanceScore = 0.0         # See analyzeHarmonicConsonance()
+        self.consonanceIntervals = 0
+        self.chords = 0                    # Number of chords that are not rests
+        self.structures = [0] * 144        # Chord structure counts, see analyzeHarmonicConsistency()
+        self.notesUsed = [0] * 12          # Pitch class counts, see analyzeMacroharmony() and analyzeCentricity()
+        self.melodyMidi = [0] * 128        # Melody note counts, see analyzeCohesion()
+        self.durations = [0] * 16          # Duration counts, see analyzeNoteLength()
+        self.melodyOctaves = [0] * 12      # See analyzeOctave()
+        self.harmonyOctaves = [0] * 12
+        self.commonNotes = 0               # See analyzeCommonNotes()
+        self.chordPairs = 0
+        self.firstChord = -1               # Index of the chord analyzeCohesion() holds the melody against
+        self.firstChordNotes = None
+        self.cohesionScore = 0.0
+
+        # A single pass over the note records, accumulating what every heuristic needs. This is how every fresh
+        # DNA is analyzed, so it is inlined with everything bound to locals rather than built on __addNote().
+        # It must add up exactly what __addNote() and __addPair() do, change them together (See Benchmark.py --check)
+        restThreshold = DataScore.REST_THRESHOLD
+        durations = self.durations
+        notesUsed = self.notesUsed
+        melodyMidi = self.melodyMidi
+        melodyOctaves = self.melodyOctaves
+        harmonyOctaves = self.harmonyOctaves
+        structures = self.structures
+        pitchClasses = PITCH_CLASSES
+        octaves = OCTAVES
+        melodyNotes = chords = consonanceIntervals = chordPairs = commonNotes = totalDistance = 0
+        consonanceScore = 0.0
+        prevMidi = None  # The last melody note that is not a rest
+        prevChord = None # The sorted pitch classes of the previous chord, None if it is a rest
+        for i in range(0, self.notes * 8, 8):
+            midi, melodyLength, melodyRest, root, second, third, harmonyLength, harmonyRest = data[i:i + 8]
+            durations[melodyLength % 16] += 1
+            durations[harmonyLength % 16] += 1
+
+            if melodyRest > restThreshold:
+                # analyzeOctave() does not skip melodic rests, see analyzeOctaveBatch()
+                melodyOctaves[11] += 1
+            else:
+                melodyNotes += 1
+                melodyMidi[midi] += 1
+                notesUsed[pitchClasses[midi]] += 1
+                melodyOctaves[octaves[midi]] += 1
+                if prevMidi is not None:
+                    totalDistance += abs(midi - prevMidi)
+                prevMidi = midi
+
+            if harmonyRest > restThreshold:
+                prevChord = None
+                continue
+            chords += 1
+            for note in (root, second, third):
+                notesUsed[pitchClasses[note]] += 1
+                harmonyOctaves[octaves[note]] += 1
+            consonance = CONSONANCE_LOOKUP[root]
+            if second != root:
+                consonanceIntervals += 1
+                consonanceScore += consonance[second]
+            if third != root:
+                consonanceIntervals += 1
+                consonanceScore += consonance[third]
+            intervals = INTERVAL_LOOKUP[root]
+            structures[STRUCTURE_LOOKUP[intervals[second]][intervals[third]]] += 1
+
+            low, middle, high = sorted((root, second, third))
+            chord = (pitchClasses[low], pitchClasses[middle], pitchClasses[high])
+            if prevChord is not None:
+                chordPairs += 1
+                commonNotes += (chord[0] == prevChord[0]) + (chord[1] == prevChord[1]) + (chord[2] == prevChord[2])
+            prevChord = chord
+            if self.firstChord == -1:
+                self.firstChord = i // 8
+                self.firstChordNotes = (root, second, third)
+
+        self.melodyNotes = melodyNotes
+        self.totalDistance = totalDistance
+        self.consonanceScore = consonanceScore
+        self.consonanceIntervals = consonanceIntervals
+        self.chords = chords
+        self.commonNotes = commonNotes
+        self.chordPairs = chordPairs
+        self.cohesionScore = self.__getCohesionScore()
+
+    # Description:
+    #   Return a copy of these statistics, to be updated independently
+    def copy(self):
+        other = ScoreStatistics([])
+        other.__dict__.update(self.__dict__)
+        for name in ("structures", "notesUsed", "melodyMidi", "durations", "melodyOctaves", "harmonyOctaves"):
+            setattr(other, name, list(getattr(self, name)))
+        return other
+
+    # Description:
+    #   Update these statistics from the genome old to the genome new, which only differ in notes start to stop.
+    # Parameters:
+    #   old ([7bits]): The genome these statistics currently describe
+    #   new ([7bits]): The genome these statistics should describe
+    #   start (number): The index of the first note that may differ
+    #   stop (number): One past the index of the last note that may differ
+    def update(self, old, new, start, stop):
+        for i in range(start, stop):
+            self.__addNote(old, i, -1)
+            self.__addNote(new, i, 1)
+        for i in range(max(start - 1, 0), min(stop, self.notes - 1)):
+            self.__addPair(old, i, -1)
+            self.__addPair(new, i, 1)
+
+        # Only the jumps between the melody notes surrounding the changed notes may differ
+        previous = self.__findMelody(new, start - 1, -1)
+        end = self.__findMelody(new, stop, 1)
+        end = self.notes if end == -1 else end + 1
+        self.totalDistance += self.__getDistance(new, previous, start, end) - self.__getDistance(old, previous, start, end)
+
+        # Cohesion only has to be recomputed from scratch if the chord the melody is held against changed
+        chordNotes = self.firstChordNotes
+        if self.firstChord == -1 or self.firstChord >= start:
+            self.__findFirstChord(new, start)
+        if chordNotes != self.firstChordNotes:
+            self.cohesionScore = self.__getCohesionScore()
+        elif chordNotes is not None:
+            for i in range(start, stop):
+                oldRecord = getNoteRecord(old, i)
+                newRecord = getNoteRecord(new, i)
+                if oldRecord[2] <= DataScore.REST_THRESHOLD:
+                    self.cohesionScore -= self.__getCohesion(oldRecord[0])
+                if newRecord[2] <= DataScore.REST_THRESHOLD:
+                    self.cohesionScore += self.__getCohesion(newRecord[0])
+
+    # Description:
+    #   Return the same array of scores as ScoreAnalyzer.getAnalysisScore() would for the genome described
+    def getAnalysisScore(self):
+        motion = 1 - (self.totalDistance / (58 * (0.1 + self.melodyNotes)))
+        consonance = self.consonanceScore / (0.1 + self.consonanceIntervals)
+
+        mostCommon = sorted([max(self.structures[i * 12:i * 12 + 12]) for i in range(0, 12)])
+        consistency = sum(mostCommon[-3:]) / (0.01 + self.chords)
+
+        macroharmony = getMacroharmonyScore(self.notesUsed)
+        centricity = getCentricityScore(self.notesUsed)
+        cohesion = self.cohesionScore / (0.1 + 3 * self.melodyNotes) if self.firstChord != -1 else 0.0
+
+        durations = sorted(self.durations)
+        totalDurations = 0.01 + 2 * self.notes
+        noteLength = (durations[-1] / totalDurations) + (durations[-2] / totalDurations)
+
+        octave = (max(self.melodyOctaves) / (0.01 + self.notes) + max(self.harmonyOctaves) / (0.01 + 3 * self.chords)) / 2.0
+        commonNotes = self.commonNotes / ((0.01 + self.chordPairs) * 3)
+
+        return [motion, consonance, consistency, macroharmony, centricity, cohesion, noteLength, octave, commonNotes]
+
+    # Description:
+    #   Add (sign 1) or remove (sign -1) everything note i contributes on its own.
+    #   Mirrored by the pass in __init__(), change both together.
+    def __addNote(self, data, i, sign):
+        record = getNoteRecord(data, i)
+        self.durations[record[1] % 16] += sign
+        self.durations[record[6] % 16] += sign
+
+        if record[2] > DataScore.REST_THRESHOLD:
+            # analyzeOctave() does not skip melodic rests, see analyzeOctaveBatch()
+            self.melodyOctaves[11] += sign
+        else:
+            midi = record[0]
+            self.melodyNotes += sign
+            self.melodyMidi[midi] += sign
+            self.notesUsed[PITCH_CLASSES[midi]] += sign
+            self.melodyOctaves[OCTAVES[midi]] += sign
+
+        if record[7] > DataScore.REST_THRESHOLD: return
+        self.chords += sign
+        root = record[3]
+        for note in record[3:6]:
+            self.notesUsed[PITCH_CLASSES[note]] += sign
+            self.harmonyOctaves[OCTAVES[note]] += sign
+        for note in record[4:6]:
+            if note == root: continue
+            self.consonanceIntervals += sign
+            self.consonanceScore += sign * CONSONANCE_LOOKUP[root][note]
+        intervals = INTERVAL_LOOKUP[root]
+        self.structures[STRUCTURE_LOOKUP[intervals[record[4]]][intervals[record[5]]]] += sign
+
+    # Description:
+    #   Add (sign 1) or remove (sign -1) what the chords i and i + 1 contribute together.
+    #   Mirrored by the pass in __init__(), change both together.
+    def __addPair(self, data, i, sign):
+        record1 = getNoteRecord(data, i)
+        record2 = getNoteRecord(data, i + 1)
+        if record1[7] > DataScore.REST_THRESHOLD or record2[7] > DataScore.REST_THRESHOLD: return
+
+        chord1 = sorted(record1[3:6])
+        chord2 = sorted(record2[3:6])
+        self.chordPairs += sign
+        for j in range(0, 3):
+            if PITCH_CLASSES[chord1[j]] == PITCH_CLASSES[chord2[j]]:
+                self.commonNotes += sign
+
+    # Description:
+    #   Return the index of the first melody note that is not a rest from note i on in direction step, -1 if there is none
+    def __findMelody(self, data, i, step):
+        while 0 <= i < self.notes:
+            if getNoteRecord(data, i)[2] <= DataScore.REST_THRESHOLD:
+                return i
+            i += step
+        return -1
+
+    # Description:
+    #   Return the summed jumps between consecutive melody notes from note previous
+    #   (a melody note that is not a rest, or -1 for none) through notes start to stop
+    def __getDistance(self, data, previous, start, stop):
+        prevMidi = getNoteRecord(data, previous)[0] if previous != -1 else None
+        distance = 0
+        for i in range(start, stop):
+            record = getNoteRecord(data, i)
+            if record[2] > DataScore.REST_THRESHOLD: continue
+            if prevMidi is not None:
+                distance += abs(record[0] - prevMidi)
+            prevMidi = record[0]
+        return distance
+
+    def __findFirstChord(self, data, i):
+        self.firstChord = -1
+        self.firstChordNotes = None
+        while i < self.notes:
+            record = getNoteRecord(data, i)
+            if record[7] <= DataScore.REST_THRESHOLD:
+                self.firstChord = i
+                self.firstChordNotes = tuple(record[3:6])
+                return
+            i += 1
+
+    def __getCohesion(self, midi):
+        score = 0.0
+        cohesion = COHESION_LOOKUP[midi]
+        for note in self.firstChordNotes:
+            score += cohesion[note]
+        return score
+
+    def __getCohesionScore(self):
+        if self.firstChordNotes is None:
+            return 0.0
+        score = 0.0
+        for midi in range(0, 128):
+            if self.melodyMidi[midi] > 0:
+                score += self.melodyMidi[midi] * self.__getCohesion(midi)
+        return score
+
+
+
+###########################################################################
+#                            Batch Analysis                               #
+###########################################################################
+
+# The heuristics above, implemented as array arithmetic over a whole genome matrix at once.
+# Each mirrors its scalar counterpart exactly, quirks included, so either may be used for a genome.
+
+# Description:
+#   Count each individual's notes once, as the histograms analyzeMacroharmonyBatch(), analyzeCentricityBatch()
+#   and analyzeOctaveBatch() share. Rests are excluded, except that a melodic rest counts in the last octave
+#   as in analyzeOctave().
+# Returns:
+#   (pitchClasses, melodyOctaves, harmonyOctaves), each (N, 12): the pitch classes of the melody and chord notes,
+#   and the octaves of the melody and of the chord notes
+def getHistograms(melody, melodyRest, chords, harmonyRest):
+    count = len(melody)
+    # One bincount over (individual, part, MIDI note), the MIDI notes padded to 11 full octaves
+    offsets = numpy.arange(count)[:, None] * 264
+    melodyIndices = (melody + offsets)[~melodyRest]
+    chordIndices = (chords + (offsets + 132)[:, :, None])[~harmonyRest].ravel()
+    counts = numpy.bincount(numpy.concatenate((melodyIndices, chordIndices)), minlength=count * 264)
+    counts = counts.reshape(count, 2, 11, 12)
+
+    pitchClasses = counts.sum(axis=(1, 2))
+    octaves = numpy.zeros((count, 2, 12), dtype=counts.dtype)
+    octaves[:, :, :11] = counts.sum(axis=3)
+    octaves[:, 0, 11] += melodyRest.sum(axis=1)
+    return pitchClasses, octaves[:, 0], octaves[:, 1]
+
+# Description:
+#   Batch analyzeMelodicMotion()
+def analyzeMelodicMotionBatch(melody, melodyRest):
+    played = ~melodyRest
+    # Index of the last played note strictly before each note, -1 if there is none
+    positions = numpy.where(played, numpy.arange(melody.shape[1]), -1)
+    previous = numpy.empty_like(positions)
+    previous[:, 0] = -1
+    previous[:, 1:] = numpy.maximum.accumulate(positions, axis=1)[:, :-1]
+
+    previousMidi = numpy.take_along_axis(melody, numpy.maximum(previous, 0), axis=1)
+    linked = played & (previous >= 0)
+    totalDistance = numpy.where(linked, numpy.abs(melody - previousMidi), 0).sum(axis=1)
+    totalNotes = 0.1 + played.sum(axis=1)
+    return 1 - (totalDistance / (58 * totalNotes))
+
+# Description:
+#   Batch analyzeHarmonicConsonance()
+def analyzeHarmonicConsonanceBatch(chords, harmonyRest):
+    played = ~harmonyRest
+    cumulativeScore = numpy.zeros(len(chords))
+    totalIntervals = numpy.full(len(chords), 0.1)
+    for i in (1, 2):
+        # As in the scalar version, notes equal to the first chord note are not counted
+        counted = played & (chords[:, :, i] != chords[:, :, 0])
+        cumulativeScore += (CONSONANCE_TABLE[chords[:, :, 0], chords[:, :, i]] * counted).sum(axis=1)
+        totalIntervals += counted.sum(axis=1)
+    return cumulativeScore / totalIntervals
+
+# Description:
+#   Batch analyzeHarmonicConsistency()
+def analyzeHarmonicConsistencyBatch(chords, harmonyRest):
+    played = ~harmonyRest
+    interval1 = INTERVAL_CLASS_TABLE[chords[:, :, 0], chords[:, :, 1]]
+    interval2 = INTERVAL_CLASS_TABLE[chords[:, :, 0], chords[:, :, 2]]
+    structures = STRUCTURE_TABLE[interval1, interval2] + numpy.arange(len(chords))[:, None] * 144
+    counts = numpy.bincount(structures[played], minlength=len(chords) * 144).reshape(len(chords), 12, 12)
+
+    mostCommon = numpy.sort(counts.max(axis=2), axis=1)[:, -3:].sum(axis=1)
+    return mostCommon / (0.01 + played.sum(axis=1))
+
+# Description:
+#   Batch analyzeMacroharmony()
+# Parameters:
+#   histogram (numpy.ndarray): (N, 12) pitch class histogram, see getHistograms()
+def analyzeMacroharmonyBatch(histogram):
+    avg = histogram.mean(axis=1)[:, None]
+    std = histogram.std(axis=1)[:, None]
+    belowTwoStdDevs = histogram < (avg - 2 * std)
+    belowOneStdDev = ~belowTwoStdDevs & (histogram < (avg - std))
+
+    mod = 1 - 0.05 * belowTwoStdDevs.sum(axis=1) - 0.10 * belowOneStdDev.sum(axis=1)
+    numberNotesUsed = ((histogram > 0) & ~belowTwoStdDevs & ~belowOneStdDev).sum(axis=1)
+    return MACRO_SCORE_ARRAY[numberNotesUsed] * mod
+
+# Description:
+#   Batch analyzeCentricity()
+# Parameters:
+#   histogram (numpy.ndarray): (N, 12) pitch class histogram, see getHistograms()
+def analyzeCentricityBatch(histogram):
+    frequencies = histogram / (0.1 + histogram.sum(axis=1))[:, None]
+    maxFreq = numpy.full(len(histogram), 0.1)
+    secondFreq = numpy.full(len(histogram), 0.1)
+    # The scalar version's running max is order dependent, so walk the pitch classes in order
+    for i in range(12):
+        freq = frequencies[:, i]
+        isMax = freq > maxFreq
+        isSecond = ~isMax & (freq > secondFreq)
+        maxFreq = numpy.where(isMax, freq, maxFreq)
+        secondFreq = numpy.where(isSecond, freq, secondFreq)
+    return 1 - (secondFreq / maxFreq)
+
+# Description:
+#   Batch analyzeCohesion()
+def analyzeCohesionBatch(melody, melodyRest, chords, harmonyRest):
+    # The scalar version only ever advances past rested chords, so every melody note is held against the first chord
+    playedChords = ~harmonyRest
+    hasChord = playedChords.any(axis=1)
+    chord = chords[numpy.arange(len(chords)), playedChords.argmax(axis=1)]
+
+    scores = COHESION_TABLE[melody[:, :, None], chord[:, None, :]].sum(axis=2)
+    played = ~melodyRest & hasChord[:, None]
+    totalIntervals = 0.1 + 3 * played.sum(axis=1)
+    return (scores * played).sum(axis=1) / totalIntervals
+
+# Description:
+#   Batch analyzeNoteLength()
+def analyzeNoteLengthBatch(melodyLength, harmonyLength):
+    lengths = numpy.concatenate((melodyLength, harmonyLength), axis=1)
+    lengths = lengths + numpy.arange(len(lengths))[:, None] * 16
+    durations = numpy.bincount(lengths.ravel(), minlength=len(lengths) * 16).reshape(len(lengths), 16)
+
+    mostCommon = numpy.sort(durations, axis=1)
+    totalDurations = 0.01 + lengths.shape[1]
+    return (mostCommon[:, -1] / totalDurations) + (mostCommon[:, -2] / totalDurations)
+
+# Description:
+#   Batch analyzeOctave()
+# Parameters:
+#   melodyOctaves, harmonyOctaves (numpy.ndarray): (N, 12) octave histograms, see getHistograms()
+def analyzeOctaveBatch(melodyOctaves, harmonyOctaves):
+    # Melodic rests are in melodyOctaves, so it sums to the number of notes
+    mostCommonMelodyOctave = melodyOctaves.max(axis=1) / (0.01 + melodyOctaves.sum(axis=1))
+    mostCommonHarmonyOctave = harmonyOctaves.max(axis=1) / (0.01 + harmonyOctaves.sum(axis=1))
+    return (mostCommonMelodyOctave + mostCommonHarmonyOctave) / 2.0
+
+# Description:
+#   Batch analyzeCommonNotes()
+def analyzeCommonNotesBatch(chords, harmonyRest):
+    played = ~harmonyRest
+    pitchClasses = PITCH_CLASS_TABLE[numpy.sort(chords, axis=2)]
+    common = (pitchClasses[:, :-1] == pitchClasses[:, 1:]).sum(axis=2)
+    pairs = played[:, :-1] & played[:, 1:]
+    totalChords = 0.01 + pairs.sum(axis=1)
+    return (common * pairs).sum(axis=1) / (totalChords * 3)
+
+# Description:
+#   Analyze a batch of dataScores with the above heuristics
+# Parameters:
+#   dataScore (DataScore): A batch of dataScores, see DataScore.decode()
+#   metrics (Metrics) - optional: Times each heuristic (See Metrics.py)
+# Returns:
+#   (N, 9) array, each row in the order of getAnalysisScore()
+def analyzeDataScores(dataScore, metrics=Metrics.NULL_METRICS):
+    with metrics.time("decode"):
+        # The pitches are subtracted from one another, uint8 would wrap around
+        melody = dataScore.melody.astype(numpy.intp)
+        chords = dataScore.chords.astype(numpy.intp)
+        melodyRest = dataScore.melodyRest
+        harmonyRest = dataScore.harmonyRest
+        histogram, melodyOctaves, harmonyOctaves = getHistograms(melody, melodyRest, chords, harmonyRest)
+
+    fitness = numpy.empty((len(melody), 9))
+    with metrics.time("analyzeMelodicMotion"):
+        fitness[:, 0] = analyzeMelodicMotionBatch(melody, melodyRest)
+    with metrics.time("analyzeHarmonicConsonance"):
+        fitness[:, 1] = analyzeHarmonicConsonanceBatch(chords, harmonyRest)
+    with metrics.time("analyzeHarmonicConsistency"):
+        fitness[:, 2] = analyzeHarmonicConsistencyBatch(chords, harmonyRest)
+    with metrics.time("analyzeMacroharmony"):
+        fitness[:, 3] = analyzeMacroharmonyBatch(histogram)
+    with metrics.time("analyzeCentricity"):
+        fitness[:, 4] = analyzeCentricityBatch(histogram)
+    with metrics.time("analyzeCohesion"):
+        fitness[:, 5] = analyzeCohesionBatch(melody, melodyRest, chords, harmonyRest)
+    with metrics.time("analyzeNoteLength"):
+        fitness[:, 6] = analyzeNoteLengthBatch(dataScore.melodyLength, dataScore.harmonyLength)
+    with metrics.time("analyzeOctave"):
+        fitness[:, 7] = analyzeOctaveBatch(melodyOctaves, harmonyOctaves)
+    with metrics.time("analyzeCommonNotes"):
+        fitness[:, 8] = analyzeCommonNotesBatch(chords, harmonyRest)
+    return fitness
+
+# Description:
+#   Analyze a whole genome matrix with the above heuristics
+# Parameters:
+#   genomes (numpy.ndarray): (N, length * 8) uint8 matrix, one genome per row (See DNA.py)
+#   metrics (Metrics) - optional: Times decoding and each heuristic (See Metrics.py)
+# Returns:
+#   (N, 9) array, each row in the order of getAnalysisScore()
+def analyzeGenomes(genomes, metrics=Metrics.NULL_METRICS):
+    with metrics.time("decode"):
+        dataScore = DataScore.decode(genomes)
+    return analyzeDataScores(dataScore, metrics)
@@ -4,22 +4,28 @@
 ##  Description: The "client-end" score generator                            ##
 ###############################################################################
 
+import Checkpoint
+import DNA
+import Metrics
 import Population
+import Reporting
+import numpy
+import time
 
-import cProfile
+# Generations of history allocated at once when generate() is not given maxGenerations
+HISTORY_BLOCK = 1024
 
-# For runtime profiling, can safely ignore
-def do_cprofile(func):
-    def profiled_func(*args, **kwargs):
-        profile = cProfile.Profile()
-        try:
-            profile.enable()
-            result = func(*args, **kwargs)
-            profile.disable()
-            return result
-        finally:
-            profile.print_stats(sort='time')
-    return profiled_func
+# Description:
+#   Hand a generated DNA to a sink
+# Parameters:
+#   dna (DNA): The DNA to hand over
+#   sink (string, file or function): A path to write a MIDI file to, an open binary file-like object
+#                                    (eg. a buffer) to write the MIDI bytes to, or a function to call with dna
+def writeToSink(dna, sink):
+    if callable(sink):
+        sink(dna)
+    else:
+        dna.writeMidi(sink)
 
 
 class ScoreGenerator:
@@ -33,25 +39,163 @@ class ScoreGenerator:
     #   modifiers ([Number]): An array of numbers corresponding to which characteristics to emphasize.
     #                         In the order of: Motion, consonance, consistency, macroharmony,
     #                         centricity, cohesion, note length, octave, and common notes between chords.
-    def __init__(self, size, length, rate=0.01, modifiers=[1.0,1.0,1.0,1.0,1.0,1.0,1.0,1.0,1.0]):
+    #   workers (number) - optional: Number of worker processes to breed with, 0 to stay in this process. (See Population.py)
+    #   selection (object) - optional: How parents are picked by the probabilistic method. (See Selection.py)
+    #   reporter (Reporter) - optional: Given a record of each generation (See Reporting.py), None to report nothing.
+    #   checkpointPath (string) - optional: A file to snapshot the population to while generating (See Checkpoint.py)
+    #   checkpointInterval (number) - optional: The number of generations between two snapshots
+    #   checkpoint (dict) - optional: A loaded checkpoint to start from, see resume()
+    #   metrics (Metrics) - optional: Collects per-generation timings and counts, eg. Metrics.Metrics(output=jsonLinesFile).
+    #                                 Off by default, see Metrics.py
+    #   elites (number) - optional: The number of fittest DNA carried over unchanged into each generation
+    #   replacement (number) - optional: Fraction of the population replaced each generation, below 1.0 for a
+    #                                    steady-state population (See Population.py)
+    #   seed (number) - optional: Seeds the run, the same seed and settings always generate the same score.
+    #                             By default the seed is drawn from numpy.random.
+    def __init__(self, size, length, rate=0.01, modifiers=[1.0,1.0,1.0,1.0,1.0,1.0,1.0,1.0,1.0], workers=0, selection=None,
+                 reporter=Reporting.PrintReporter(), checkpointPath=None, checkpointInterval=10, checkpoint=None,
+                 metrics=None, elites=0, replacement=1.0, seed=None):
         if len(modifiers) != 9:
             print "Modifiers must be exactly 9 elements long."
             return
+        if checkpointInterval < 1:
+            print "Checkpoint interval must be at least 1 generation."
+            return
 
-        self.history = []
-        self.population = Population.Population(size, length, rate, modifiers)
+        self.history = numpy.empty((0, 2)) # Best and mean weighted fitness of each generation of the last generate()
+        self.stopReason = None # Why the last generate() stopped, see generate()
+        self.metrics = metrics if metrics is not None else Metrics.NULL_METRICS
+        self.population = Population.Population(size, length, rate, modifiers, workers, selection,
+                                                reporter=reporter, checkpoint=checkpoint, metrics=self.metrics,
+                                                elites=elites, replacement=replacement, seed=seed)
         self.modifiers = modifiers
+        self.checkpointPath = checkpointPath
+        self.checkpointInterval = checkpointInterval
 
     # Description:
-    #   Generate a score of at least the given threshold.
+    #   Generate a score of at least the given threshold, or the best one found before a stopping criterion is met.
+    #   Afterwards stopReason tells which of "threshold", "maxGenerations", "timeLimit", "plateau" or "diversity"
+    #   stopped it, and getHistory() gives the best and mean fitness of each generation.
     # Parameters:
     #   threshold (number): The goal value. Between 0.0 and 1.0
     #   deterministic (boolean): Whether or not to use the Detereministic or probabilistic generation methods.
     #                            Generally, determistic is faster but more likely to plateau.
-    # @do_cprofile
-    def generate(self, threshold, deterministic=True):
-        greatestChild = self.population.getGeneration(self.modifiers, deterministic)
-        while greatestChild.getFitness(self.modifiers) < threshold:
-            greatestChild = self.population.getGeneration(self.modifiers, deterministic)
-        greatestChild.getScore().show()
+    #   sink (string, file or function) - optional: Where to hand the result (See writeToSink()).
+    #                                               By default it is shown with Music21, which blocks on the viewer.
+    #   maxGenerations (number) - optional: The most generations to breed
+    #   timeLimit (number) - optional: The most seconds to spend, checked after each generation
+    #   plateauWindow (number) - optional: Stop once the best fitness so far has not improved by more than
+    #                                      plateauTolerance over this many generations
+    #   plateauTolerance (number) - optional: See plateauWindow
+    #   minDiversity (number) - optional: Stop once the population's diversity falls below this (See Population.getDiversity())
+    def generate(self, threshold, deterministic=True, sink=None, maxGenerations=None, timeLimit=None,
+                 plateauWindow=None, plateauTolerance=1e-6, minDiversity=None):
+        start = time.time()
+        history = numpy.empty((maxGenerations if maxGenerations is not None else HISTORY_BLOCK, 2))
+        greatestSoFar = numpy.empty(len(history)) # The greatest fitness up to each generation, for plateau detection
+        generations = 0
+        greatest = None
+        self.stopReason = None
+        for record in self.iterate(deterministic):
+            fitness = record["fitness"]
+            if greatest is None or fitness > greatest["fitness"]:
+                greatest = record
+
+            if generations == len(history):
+                history = numpy.concatenate((history, numpy.empty((HISTORY_BLOCK, 2))))
+                greatestSoFar = numpy.concatenate((greatestSoFar, numpy.empty(HISTORY_BLOCK)))
+            history[generations] = (fitness, record["mean"])
+            greatestSoFar[generations] = greatest["fitness"]
+            generations += 1
+
+            if fitness >= threshold:
+                self.stopReason = "threshold"
+            elif maxGenerations is not None and generations >= maxGenerations:
+                self.stopReason = "maxGenerations"
+            elif timeLimit is not None and time.time() - start >= timeLimit:
+                self.stopReason = "timeLimit"
+            elif (plateauWindow is not None and generations > plateauWindow and
+                  greatestSoFar[generations - 1] - greatestSoFar[generations - 1 - plateauWindow] <= plateauTolerance):
+                self.stopReason = "plateau"
+            elif minDiversity is not None and self.population.getDiversity() < minDiversity:
+                self.stopReason = "diversity"
+            if self.stopReason is not None:
+                break
+        self.history = history[:generations]
+        greatestChild = getDNA(greatest)
+
+        if sink is None:
+            greatestChild.getScore().show()
+        else:
+            writeToSink(greatestChild, sink)
         return greatestChild
+
+    # Description:
+    #   Breed generations for as long as the caller keeps iterating, yielding a record of each one as it is bred:
+    #   { generation ; genome ; fitness ; fitnessArray ; mean ; variance ; seconds }
+    #   genome is the raw bytes of the generation's best genome (See getDNA()), fitness and fitnessArray its fitness,
+    #   mean and variance those of the whole generation's weighted fitness, and seconds the time breeding it took.
+    #   Nothing else is copied out of the population, break out of the loop to stop.
+    # Parameters:
+    #   deterministic (boolean): See generate()
+    def iterate(self, deterministic=True):
+        while True:
+            start = time.time()
+            child = self.population.getGeneration(self.modifiers, deterministic)
+            self.__saveCheckpoint()
+            weighted = self.population.weighted
+            yield {"generation": self.population.generation,
+                   "genome": child.data.tobytes(),
+                   "fitness": child.getFitness(self.modifiers),
+                   "fitnessArray": [float(value) for value in child.getFitnessArray()],
+                   "mean": float(weighted.mean()),
+                   "variance": float(weighted.var()),
+                   "seconds": time.time() - start}
+
+    # Description:
+    #   Return the (generations, 2) history of the last generate(): the best and mean weighted fitness of each generation
+    def getHistory(self):
+        return self.history
+
+    # Description:
+    #   Return the fittest DNA on the population's Pareto front for each set of modifiers, without evolving again.
+    #   Best run with selection=Selection.ParetoSelection(), which keeps the front spread over every trade-off.
+    # Parameters:
+    #   modifiersList ([[Number]]): Sets of 9 modifiers, as in ScoreGenerator()
+    def getParetoBest(self, modifiersList):
+        genomes, fitness = self.population.getParetoFront()
+        weights = numpy.array([DNA.normalizeModifiers(modifiers) for modifiers in modifiersList])
+        best = fitness.dot(weights.T).argmax(axis=0)
+        return [DNA.DNA(self.population.length, genomes[i], fitness[i]) for i in best]
+
+    def __saveCheckpoint(self):
+        if self.checkpointPath is not None and self.population.generation % self.checkpointInterval == 0:
+            with self.metrics.time("checkpoint"):
+                Checkpoint.save(self.checkpointPath, self.population)
+
+    # Description:
+    #   Shut down the population's worker processes, if any
+    def close(self):
+        self.population.close()
+
+
+# Description:
+#   Return the best DNA of a generation record (See ScoreGenerator.iterate()), eg. to export it
+# Parameters:
+#   record (dict): The record of a generation
+def getDNA(record):
+    genome = numpy.frombuffer(record["genome"], dtype=numpy.uint8).copy()
+    return DNA.DNA(len(genome) // 8, genome, numpy.array(record["fitnessArray"]))
+
+# Description:
+#   Resume a generator from a checkpoint it wrote (See ScoreGenerator's checkpointPath).
+#   It keeps checkpointing to the same file.
+# Parameters:
+#   path (string): The checkpoint file
+#   The rest as in ScoreGenerator(), size, length, rate and modifiers are those of the checkpoint
+def resume(path, workers=0, selection=None, reporter=Reporting.PrintReporter(), checkpointInterval=10, metrics=None,
+           elites=0, replacement=1.0):
+    checkpoint = Checkpoint.load(path)
+    return ScoreGenerator(checkpoint["size"], checkpoint["length"], checkpoint["rate"], checkpoint["modifiers"],
+                          workers, selection, reporter, path, checkpointInterval, checkpoint, metrics,
+                          elites, replacement)
@@ -0,0 +1,193 @@
+###############################################################################
+##  Name:    Joshua Becker                                                   ##
+##                                                                           ##
+##  Description: Parent selection strategies for the probabilistic           ##
+##               generation method (See Population.py). A strategy is any    ##
+##               object with:                                                ##
+##               select(fitness, count, random) -> count populace indices,   ##
+##                 picking all the parents of a generation at once, the same ##
+##                 individual possibly more than once, drawing from the      ##
+##                 numpy.random.RandomState random                           ##
+##               multiObjective - optional: when true, fitness is the whole  ##
+##                 (N, 9) fitness matrix, otherwise the weighted fitness     ##
+##                 of each individual. A multi-objective select() is also    ##
+##                 given ranking, the fronts and crowding distances of       ##
+##                 fitness (See paretoRanking())                             ##
+###############################################################################
+
+import numpy
+
+# The most dominance matrix entries nonDominatedSort() compares at once, a block this big stays in cache
+DOMINANCE_BLOCK = 1 << 18
+
+###########################################################################
+#                              Utilities                                  #
+###########################################################################
+
+# Description:
+#   Turn weighted fitnesses into cumulative selection weights.
+#   Negative fitness is treated as zero, and an all zero populace is picked from uniformly.
+# Parameters:
+#   fitness (numpy.ndarray): The weighted fitness of each individual
+def cumulativeWeights(fitness):
+    weights = numpy.clip(numpy.asarray(fitness, dtype=float), 0.0, None)
+    if weights.sum() <= 0.0:
+        weights = numpy.ones(len(weights))
+    return numpy.cumsum(weights)
+
+# Description:
+#   Fast non-dominated sort: the Pareto front of each individual, every objective being maximized.
+#   0 is the non-dominated front, 1 the front that is non-dominated once front 0 is removed, and so on.
+#   The dominance matrix is built a block of rows at a time and kept bit-packed, N * N / 8 bytes.
+# Parameters:
+#   fitness (numpy.ndarray): (N, objectives) fitness matrix
+def nonDominatedSort(fitness):
+    count = len(fitness)
+    # In descending lexicographic order whoever dominates comes first, and is at least as fit in the first objective.
+    # Each row then dominates exactly the later rows it is at least as fit as in the other objectives,
+    # unless they are equal in every objective.
+    order = numpy.lexsort(-fitness.T[::-1])
+    fitness = fitness[order]
+    columns = numpy.ascontiguousarray(fitness.T)
+    equal = numpy.cumsum(numpy.r_[True, (fitness[1:] != fitness[:-1]).any(axis=1)]) # Shared by equal rows
+    rows = max(1, DOMINANCE_BLOCK // max(1, count))
+    later = numpy.triu(numpy.ones((min(rows, count),) * 2, dtype=bool), 1) # [i, j] row j of a block comes after row i
+    dominance = numpy.zeros((count, (count + 7) // 8), dtype=numpy.uint8) # Bit-packed, [i, j] i dominates j
+    dominators = numpy.zeros(count, dtype=numpy.intp) # Number of individuals dominating each, not yet ranked
+    for start in range(0, count, rows):
+        stop = min(start + rows, count)
+        block = numpy.zeros((stop - start, count), dtype=bool)
+        dominated = equal[start:stop, None] != equal[start:]
+        dominated[:, :stop - start] &= later[:stop - start, :stop - start]
+        for objective in range(1, fitness.shape[1]):
+            dominated &= fitness[start:stop, objective, None] >= columns[objective, start:]
+        block[:, start:] = dominated
+        dominators += block.sum(axis=0)
+        dominance[start:stop] = numpy.packbits(block, axis=1)
+
+    sortedRanks = numpy.full(count, -1, dtype=numpy.intp)
+    front = numpy.flatnonzero(dominators == 0)
+    rank = 0
+    while len(front) > 0:
+        sortedRanks[front] = rank
+        for start in range(0, len(front), rows):
+            block = numpy.unpackbits(dominance[front[start:start + rows]], axis=1)[:, :count]
+            dominators -= block.sum(axis=0, dtype=numpy.intp)
+        dominators[front] = -1
+        front = numpy.flatnonzero(dominators == 0)
+        rank += 1
+
+    ranks = numpy.empty(count, dtype=numpy.intp)
+    ranks[order] = sortedRanks
+    return ranks
+
+# Description:
+#   NSGA-II crowding distance of each individual within its front, the larger the more isolated.
+#   The extremes of each objective in a front are infinitely far.
+# Parameters:
+#   fitness (numpy.ndarray): (N, objectives) fitness matrix
+#   ranks (numpy.ndarray): The front of each individual, see nonDominatedSort()
+def crowdingDistance(fitness, ranks):
+    distance = numpy.zeros(len(fitness))
+    if len(fitness) == 0:
+        return distance
+    for objective in range(fitness.shape[1]):
+        # Every front sorted by this objective, one front after another
+        order = numpy.lexsort((fitness[:, objective], ranks))
+        values = fitness[order, objective]
+        sortedRanks = ranks[order]
+        starts = numpy.flatnonzero(numpy.r_[True, sortedRanks[1:] != sortedRanks[:-1]])
+        ends = numpy.r_[starts[1:], len(order)] - 1
+        spans = numpy.repeat(values[ends] - values[starts], ends - starts + 1)
+
+        interior = numpy.ones(len(order), dtype=bool)
+        interior[starts] = False
+        interior[ends] = False
+        gaps = numpy.zeros(len(order))
+        gaps[1:-1] = values[2:] - values[:-2]
+        spread = interior & (spans > 0)
+        gaps[spread] /= spans[spread]
+        gaps[interior & ~spread] = 0.0
+        gaps[~interior] = numpy.inf
+        distance[order] += gaps
+    return distance
+
+# Description:
+#   Return (ranks, distance), the front and crowding distance of each individual (See NSGA-II)
+# Parameters:
+#   fitness (numpy.ndarray): (N, objectives) fitness matrix
+def paretoRanking(fitness):
+    ranks = nonDominatedSort(fitness)
+    return ranks, crowdingDistance(fitness, ranks)
+
+# Description:
+#   Return the indices of a fitness matrix ordered best first by front, then by crowding distance
+# Parameters:
+#   ranking ((numpy.ndarray, numpy.ndarray)): (ranks, distance) of the fitness matrix, see paretoRanking()
+def paretoOrder(ranking):
+    ranks, distance = ranking
+    return numpy.lexsort((-distance, ranks))
+
+
+###########################################################################
+#                           Selection Classes                             #
+###########################################################################
+
+class RouletteSelection:
+    # Description:
+    #   Fitness proportionate selection. The cumulative weights are built once per call,
+    #   then each pick is a binary search into them.
+    def select(self, fitness, count, random=numpy.random):
+        cumulative = cumulativeWeights(fitness)
+        picks = numpy.searchsorted(cumulative, random.random_sample(count) * cumulative[-1], side="right")
+        # Rounding may land a pick just past the end
+        return numpy.minimum(picks, len(cumulative) - 1)
+
+class StochasticUniversalSelection:
+    # Description:
+    #   Fitness proportionate selection with evenly spaced pointers from a single random draw,
+    #   giving every individual close to its expected number of picks.
+    def select(self, fitness, count, random=numpy.random):
+        cumulative = cumulativeWeights(fitness)
+        spacing = cumulative[-1] / count
+        pointers = (random.random_sample() + numpy.arange(count)) * spacing
+        picks = numpy.minimum(numpy.searchsorted(cumulative, pointers, side="right"), len(cumulative) - 1)
+        # Pointers come out in populace order, shuffle so that consecutive picks are not all neighbours
+        return random.permutation(picks)
+
+class TournamentSelection:
+    # Description:
+    #   Create a tournament selection strategy
+    # Parameters:
+    #   size (number) - optional: The number of individuals competing in each tournament
+    def __init__(self, size=2):
+        if size < 1:
+            raise ValueError("Tournament size must be at least 1.")
+        self.size = size
+
+    # Description:
+    #   Each pick is the fittest of size individuals drawn uniformly at random
+    def select(self, fitness, count, random=numpy.random):
+        fitness = numpy.asarray(fitness)
+        competitors = random.randint(0, len(fitness), (count, self.size))
+        winners = numpy.argmax(fitness[competitors], axis=1)
+        return competitors[numpy.arange(count), winners]
+
+class ParetoSelection:
+    # Selects on the nine fitness components rather than on one weighted fitness (See Population.py)
+    multiObjective = True
+
+    # Description:
+    #   NSGA-II binary tournament: each pick is the better of two individuals drawn uniformly at random,
+    #   the one on the lower front or, on the same front, the less crowded one
+    # Parameters:
+    #   fitness (numpy.ndarray): (N, objectives) fitness matrix of the populace
+    #   ranking ((numpy.ndarray, numpy.ndarray)) - optional: (ranks, distance) of fitness, see paretoRanking().
+    #                                                        Computed when not given.
+    def select(self, fitness, count, random=numpy.random, ranking=None):
+        fitness = numpy.asarray(fitness)
+        ranks, distance = ranking if ranking is not None else paretoRanking(fitness)
+        competitors = random.randint(0, len(fitness), (count, 2))
+        first, second = competitors[:, 0], competitors[:, 1]
+        secondWins = (ranks[second] < ranks[first]) | ((ranks[second] == ranks[first]) & (distance[second] > distance[first]))
+        return numpy.where(secondWins, second, first)